@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api"
+
+    def ready(self):
+        # Connect the write hooks that keep derived state in sync.
+        from . import authentication, counters, device_cache, events, images, search, sync, versions  # noqa: F401
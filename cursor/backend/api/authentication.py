@@ -0,0 +1,129 @@
+"""
+Cached DRF token authentication.
+
+``CachedTokenAuthentication`` replaces ``TokenAuthentication``. It keeps
+token key -> the user's non-secret fields (``CACHED_USER_FIELDS``) in the
+Django cache ``TOKEN_CACHE_ALIAS`` for ``TOKEN_CACHE_TTL`` seconds, so an
+authenticated request with a warm cache makes no query at all. The user is
+rebuilt from the cached fields as a ``User`` with every other field
+deferred: the password hash never enters the cache, reading it (e.g.
+``check_password``) loads it from the database, and ``save()`` writes only
+the cached fields.
+
+Entries are dropped, immediately and again once the transaction commits,
+whenever a user is saved (deactivated, promoted, renamed...) or deleted, and
+whenever a token is deleted or replaced. The open WebSocket connections of
+an affected user are closed too. A process that did not make the change
+only sees it immediately with a shared cache (``CACHE_REDIS_URL``); with
+per-process caches, other workers may keep accepting a revoked token for
+``TOKEN_CACHE_TTL`` seconds, which is why the TTL defaults to 300 seconds
+with a shared cache and 5 without one.
+
+Only valid tokens of active users are cached. Unknown keys always go to the
+database.
+"""
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .consumers import user_group
+
+
+def _cache():
+    return caches[getattr(settings, "TOKEN_CACHE_ALIAS", "default")]
+
+
+def _cache_key(key):
+    return f"auth-token:{key}"
+
+
+# Everything the cache may hold about a user: no password hash.
+CACHED_USER_FIELDS = (
+    "id", "username", "email", "first_name", "last_name", "is_staff", "is_superuser", "is_active",
+)
+
+
+def get_user(key):
+    """Return the active ``User`` that token ``key`` belongs to, or None."""
+    cache = _cache()
+    entry = cache.get(_cache_key(key))
+    if entry is not None:
+        # Deferred fields (password, dates) load on access; save() skips them.
+        # from_db() takes the values in model field order.
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in CACHED_USER_FIELDS]
+        return User.from_db(User.objects.db, names, [entry[name] for name in names])
+    token = Token.objects.select_related("user").filter(key=key).first()
+    if token is None or not token.user.is_active:
+        return None
+    cache.set(
+        _cache_key(key),
+        {name: getattr(token.user, name) for name in CACHED_USER_FIELDS},
+        getattr(settings, "TOKEN_CACHE_TTL", 5),
+    )
+    return token.user
+
+
+def invalidate(*keys):
+    _cache().delete_many([_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` served from ``get_user()``."""
+
+    def authenticate_credentials(self, key):
+        user = get_user(key)
+        if user is None:
+            # Same messages as TokenAuthentication, at the cost of one more
+            # query on this (rejected) path only.
+            if Token.objects.filter(key=key).exists():
+                raise AuthenticationFailed(_("User inactive or deleted."))
+            raise AuthenticationFailed(_("Invalid token."))
+        # request.auth, as TokenAuthentication sets it, without reading the row again.
+        return user, Token(key=key, user=user)
+
+
+def _close_sockets(user_id):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(user_group(user_id), {"type": "auth.revoked"})
+
+
+def revoke(user_id, keys):
+    """Forget ``keys`` now and after commit, and close ``user_id``'s sockets once committed."""
+    invalidate(*keys)
+
+    def after_commit():
+        invalidate(*keys)
+        _close_sockets(user_id)
+
+    transaction.on_commit(after_commit, robust=True)
+
+
+def _revoke_user(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    keys = list(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
+    if kwargs.get("signal") is post_delete or not instance.is_active:
+        revoke(instance.pk, keys)
+    else:
+        # Still active: refresh the cached copy of the user, keep the sockets.
+        invalidate(*keys)
+        transaction.on_commit(lambda: invalidate(*keys), robust=True)
+
+
+def _revoke_token(sender, instance, **kwargs):
+    revoke(instance.user_id, [instance.key])
+
+
+post_save.connect(_revoke_user, sender=User, dispatch_uid="auth-token-user-save")
+post_delete.connect(_revoke_user, sender=User, dispatch_uid="auth-token-user-delete")
+post_delete.connect(_revoke_token, sender=Token, dispatch_uid="auth-token-delete")
@@ -0,0 +1,56 @@
+"""
+Device reservation calendar.
+
+Active rentals are the calendar: each holds its device for the closed date
+interval ``[from_date, to_date]``. Two intervals overlap when each starts no
+later than the other ends. ``rental_device_busy_idx`` on ``(device,
+status, from_date, to_date)`` lets the database answer "does this device
+have an active rental overlapping the range?" with an index seek per device
+that reads only that device's active rentals. Returned rentals, which make
+up years of history, are never read. Listing free devices walks the device
+list in keyset-pagination order and probes the index for each candidate,
+so a page costs the same however large the rental history grows.
+
+Returned rentals free their dates. Devices in maintenance are never
+available.
+
+The calendar is the only source of truth for bookings: a rental is created
+or moved by locking the device row and running ``check_free``, so a device
+that is out today can still be booked for later dates. ``Device.availability``
+just mirrors whether an active rental covers today, and is refreshed whenever
+the device's rentals change.
+"""
+
+from django.db.models import Exists, OuterRef
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Device, Rental
+
+
+class RentalOverlap(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The device is already rented for some of these dates."
+    default_code = "rental_overlap"
+
+
+def overlapping(from_date, to_date):
+    """Active rentals whose dates intersect ``[from_date, to_date]``."""
+    return Rental.objects.filter(status="active", from_date__lte=to_date, to_date__gte=from_date)
+
+
+def available_devices(from_date, to_date, queryset=None):
+    """Devices with no active rental overlapping ``[from_date, to_date]``."""
+    if queryset is None:
+        queryset = Device.objects.all()
+    busy = overlapping(from_date, to_date).filter(device=OuterRef("pk"))
+    return queryset.exclude(availability="maintenance").filter(~Exists(busy))
+
+
+def check_free(device, from_date, to_date, exclude=None):
+    """Raise ``RentalOverlap`` if ``device`` is booked for any of these dates."""
+    clashes = overlapping(from_date, to_date).filter(device=device)
+    if exclude is not None:
+        clashes = clashes.exclude(pk=exclude.pk)
+    if clashes.exists():
+        raise RentalOverlap()
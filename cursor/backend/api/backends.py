@@ -0,0 +1,39 @@
+"""
+Authentication by email address.
+
+``EmailBackend`` accepts ``authenticate(request, email=..., password=...)``
+and finds the user in one query. The query uses the case-insensitive unique
+index ``auth_user_email_ci_uniq`` on ``NULLIF(LOWER(email), '')`` (migration
+0015) and joins in the user's API token, so the login view needs no
+further lookup for it. Usernames still work through ``ModelBackend`` (e.g.
+for the Django admin).
+"""
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.db.models import Func
+
+
+class EmailKey(Func):
+    """The expression ``auth_user_email_ci_uniq`` indexes; blank emails become NULL."""
+
+    template = "NULLIF(LOWER(%(expressions)s), '')"
+
+
+def users_with_email(email):
+    """Users whose email equals ``email`` ignoring case; at most one exists."""
+    return User.objects.alias(email_key=EmailKey("email")).filter(email_key=email.lower())
+
+
+class EmailBackend(ModelBackend):
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        user = users_with_email(email).select_related("auth_token").first()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
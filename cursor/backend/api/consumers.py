@@ -1,20 +1,83 @@
+import asyncio
 import json
+import time
 
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+# Close code for clients that fell too far behind; they should reconnect and
+# resync with ``?since=`` (see ``api.sync``).
+CLOSE_TOO_SLOW = 4008
+# Seconds between lag probes while frames are being sent.
+PROBE_INTERVAL = 1.0
+# Close code when the user is deactivated or their token revoked; clients
+# should not reconnect with the same token.
+CLOSE_REVOKED = 4001
+
+
+# Group every authenticated socket joins.
+EVERYONE = "notifications"
+
+
+def user_group(user_id):
+    return f"user.{user_id}"
+
+
+def role_group(is_staff):
+    return "role.admin" if is_staff else "role.employee"
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     """
-    Simple broadcast-style notifications consumer.
-
-    All connected clients join the same "notifications" group and receive any
-    messages that are sent by any client or from the server side.
+    Notifications consumer for authenticated users.
+
+    Anonymous handshakes are rejected (see ``api.middleware`` for token
+    authentication). Every client joins the "notifications" group, which
+    reaches everyone, plus ``user.<id>`` and ``role.admin`` or
+    ``role.employee``, so server-side events such as those published by
+    ``api.events`` can be targeted. The role is fixed when the socket
+    connects.
+
+    Group messages carry their frame already serialized as ``text`` so it is
+    encoded once per event rather than once per recipient. Outbound frames
+    are buffered for ``WS_COALESCE_MS`` and a burst is sent as
+    ``{"type": "batch", "events": [...]}`` frames of at most
+    ``WS_BATCH_SIZE`` events each.
+
+    A server may accept a send long before the client reads it (daphne
+    never makes ``send`` wait), so how far behind a client is gets measured
+    end to end instead. At most once per ``PROBE_INTERVAL`` while frames
+    flow, a ``{"type": "ping", "seq": n}`` frame follows them, and the
+    client answers ``{"type": "pong", "seq": n}`` once it has read
+    everything before it. A client whose probe, or a send to it, has been
+    outstanding for more than ``WS_MAX_LAG_MS`` leaves its groups and is
+    closed with code 4008. Sockets of a user who is deactivated or whose
+    token is revoked are closed with code 4001 (see ``api.authentication``).
     """
 
-    group_name = "notifications"
+    group_name = EVERYONE
 
     async def connect(self):
-        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        self.subscriptions = [self.group_name, user_group(user.pk), role_group(user.is_staff)]
+        self.coalesce_window = getattr(settings, "WS_COALESCE_MS", 50) / 1000
+        self.batch_size = getattr(settings, "WS_BATCH_SIZE", 100)
+        self.max_lag = getattr(settings, "WS_MAX_LAG_MS", 15000) / 1000
+        self.pending = []
+        self.flush_task = None
+        self.dropped = False
+        # When the unfinished send started, and when the unanswered probe was sent.
+        self.sending_since = None
+        self.probe_seq = 0
+        self.probe_sent_at = None
+        self.probed_at = 0.0
+
+        for group in self.subscriptions:
+            await self.channel_layer.group_add(group, self.channel_name)
         await self.accept()
 
         # Initial welcome payload so the frontend can verify connection.
@@ -26,7 +89,13 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         )
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if getattr(self, "flush_task", None) is not None:
+            self.flush_task.cancel()
+        await self.leave_groups()
+
+    async def leave_groups(self):
+        for group in getattr(self, "subscriptions", ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
 
     async def receive(self, text_data=None, bytes_data=None):
         """
@@ -43,6 +112,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             data = json.loads(text_data)
         except json.JSONDecodeError:
             return
+        if not isinstance(data, dict):
+            return
+        if data.get("type") == "pong":
+            if data.get("seq") == self.probe_seq:
+                self.probe_sent_at = None
+            return
 
         message = data.get("message", "")
         sender = data.get("sender", "anonymous")
@@ -53,21 +128,85 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 "type": "broadcast_message",
                 "message": message,
                 "sender": sender,
+                "text": json.dumps({"type": "notification", "message": message, "sender": sender}),
             },
         )
 
     async def broadcast_message(self, event):
-        await self.send_json(
-            {
-                "type": "notification",
-                "message": event.get("message", ""),
-                "sender": event.get("sender", "server"),
-            }
-        )
-
-    async def send_json(self, content):
-        await self.send(text_data=json.dumps(content))
-
+        text = event.get("text")
+        if text is None:
+            text = json.dumps(
+                {
+                    "type": "notification",
+                    "message": event.get("message", ""),
+                    "sender": event.get("sender", "server"),
+                }
+            )
+        await self.enqueue(text)
+
+    async def domain_event(self, event):
+        """Relay a model change published by ``api.events`` after commit."""
+        await self.enqueue(event["text"])
+
+    def lag(self):
+        """Seconds the client has been behind: the older of the unfinished send and the unanswered probe."""
+        started = [at for at in (self.sending_since, self.probe_sent_at) if at is not None]
+        return time.monotonic() - min(started) if started else 0.0
+
+    async def enqueue(self, text):
+        """Buffer one serialized frame for the next coalesced send."""
+        if self.dropped:
+            return
+        if self.lag() > self.max_lag:
+            await self.drop()
+            return
+        self.pending.append(text)
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush())
 
+    async def flush(self):
+        try:
+            await asyncio.sleep(self.coalesce_window)
+            # Frames that arrive while a send is in progress go out in a later batch.
+            while self.pending:
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+                if len(batch) == 1:
+                    await self.timed_send(batch[0])
+                else:
+                    await self.timed_send('{"type": "batch", "events": [' + ", ".join(batch) + "]}")
+            await self.probe()
+        finally:
+            self.flush_task = None
+
+    async def probe(self):
+        """Follow the frames just sent with a ping, unless one is still unanswered."""
+        now = time.monotonic()
+        if self.probe_sent_at is not None or now - self.probed_at < PROBE_INTERVAL:
+            return
+        self.probe_seq += 1
+        self.probe_sent_at = self.probed_at = now
+        await self.timed_send(json.dumps({"type": "ping", "seq": self.probe_seq}))
 
+    async def timed_send(self, text):
+        self.sending_since = time.monotonic()
+        try:
+            await self.send(text_data=text)
+        finally:
+            self.sending_since = None
+
+    async def auth_revoked(self, event):
+        """The user was deactivated or their token deleted."""
+        await self.drop(code=CLOSE_REVOKED)
+
+    async def drop(self, code=CLOSE_TOO_SLOW):
+        """Stop delivering to a client that cannot keep up and close its socket."""
+        self.dropped = True
+        self.pending = []
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+        await self.leave_groups()
+        await self.close(code=code)
 
+    async def send_json(self, content):
+        await self.send(text_data=json.dumps(content))
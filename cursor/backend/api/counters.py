@@ -0,0 +1,189 @@
+"""
+Incrementally maintained dashboard counters.
+
+Every counted model maps a row to the set of counter keys it contributes to
+(``job.total`` and ``job.<status>`` for a job, and so on). Signal handlers
+diff the keys before and after each write and bump only the ones that
+changed, inside the same transaction as the write (see ``TrackedModel``), so
+``get_dashboard_stats`` is a single read of the ``DashboardCounter`` table.
+
+Bulk ``QuerySet.update()`` / ``bulk_create()`` calls bypass signals; code
+that writes counted rows that way must call ``record_change`` /
+``record_created`` itself. ``rebuild()`` recomputes
+everything from the source tables and is what the
+``rebuild_dashboard_counters`` management command runs.
+"""
+
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import DashboardCounter, Device, Job, Rental
+
+
+def _job_keys(status):
+    return {"job.total", f"job.{status}"}
+
+
+def _rental_keys(status):
+    return {"rental.total", f"rental.{status}"}
+
+
+def _device_keys(availability):
+    return {"device.total", f"device.{availability}"}
+
+
+def _user_keys(is_active, is_staff):
+    if not is_active:
+        return set()
+    return {"user.total", "user.admin" if is_staff else "user.employee"}
+
+
+# model -> (fields the keys depend on, function of those field values -> keys)
+COUNTED_MODELS = {
+    Job: (("status",), _job_keys),
+    Rental: (("status",), _rental_keys),
+    Device: (("availability",), _device_keys),
+    User: (("is_active", "is_staff"), _user_keys),
+}
+
+
+def _keys_for(model, values):
+    return COUNTED_MODELS[model][1](*values)
+
+
+def _instance_values(instance):
+    fields = COUNTED_MODELS[type(instance)][0]
+    return tuple(getattr(instance, name) for name in fields)
+
+
+def _bump(keys, delta):
+    if not keys:
+        return
+    keys = sorted(keys)  # fixed lock order keeps concurrent writers deadlock-free
+    updated = DashboardCounter.objects.filter(key__in=keys).update(value=F("value") + delta)
+    if updated < len(keys):
+        existing = set(DashboardCounter.objects.filter(key__in=keys).values_list("key", flat=True))
+        missing = [key for key in keys if key not in existing]
+        # Create missing rows at zero and then add the delta like any other
+        # row: when two transactions create the same counter, the loser's
+        # insert is ignored (after waiting for the winner's row lock) but its
+        # update still applies.
+        DashboardCounter.objects.bulk_create(
+            [DashboardCounter(key=key, value=0) for key in missing],
+            ignore_conflicts=True,
+        )
+        DashboardCounter.objects.filter(key__in=missing).update(value=F("value") + delta)
+
+
+def record_change(model, before, after):
+    """
+    Apply the counter delta for one row of ``model`` whose counted fields
+    went from ``before`` to ``after`` (tuples in ``COUNTED_MODELS`` order,
+    or None for a row that did not exist / no longer exists).
+    """
+    old_keys = _keys_for(model, before) if before is not None else set()
+    new_keys = _keys_for(model, after) if after is not None else set()
+    _bump(old_keys - new_keys, -1)
+    _bump(new_keys - old_keys, +1)
+
+
+def record_created(instances):
+    """
+    Apply the counter delta for rows inserted with ``bulk_create()``, which
+    skips the signal handlers: one update per affected key, not per row.
+    """
+    totals = Counter()
+    for instance in instances:
+        if type(instance) in COUNTED_MODELS:
+            totals.update(_keys_for(type(instance), _instance_values(instance)))
+    for key, count in sorted(totals.items()):
+        _bump({key}, count)
+
+
+def snapshot():
+    """Return every counter as a ``{key: value}`` dict in one query."""
+    return dict(DashboardCounter.objects.values_list("key", "value"))
+
+
+def compute():
+    """Count everything from the source tables, one aggregate query per model."""
+    values = {}
+
+    def aggregate(prefix, queryset, field, choices):
+        totals = queryset.aggregate(
+            total=Count("pk"),
+            **{value: Count("pk", filter=Q(**{field: value})) for value, _label in choices},
+        )
+        values.update({f"{prefix}.{name}": count for name, count in totals.items()})
+
+    aggregate("job", Job.objects.all(), "status", Job.STATUS_CHOICES)
+    aggregate("rental", Rental.objects.all(), "status", Rental.STATUS_CHOICES)
+    aggregate("device", Device.objects.all(), "availability", Device.AVAILABILITY_CHOICES)
+
+    users = User.objects.aggregate(
+        total=Count("pk", filter=Q(is_active=True)),
+        admin=Count("pk", filter=Q(is_active=True, is_staff=True)),
+        employee=Count("pk", filter=Q(is_active=True, is_staff=False)),
+    )
+    values.update({f"user.{name}": count for name, count in users.items()})
+    return values
+
+
+def _drift(stored, actual):
+    return {
+        key: (stored.get(key), value)
+        for key, value in actual.items()
+        if stored.get(key) != value
+    }
+
+
+def check():
+    """Return ``{key: (stored, actual)}`` for every drifted counter, without writing."""
+    return _drift(snapshot(), compute())
+
+
+@transaction.atomic
+def rebuild():
+    """
+    Recompute all counters and overwrite the stored values.
+
+    Returns ``{key: (stored, actual)}`` for every counter that had drifted.
+    """
+    actual = compute()
+    stored = {
+        counter.key: counter.value
+        for counter in DashboardCounter.objects.select_for_update()
+    }
+    drift = _drift(stored, actual)
+    for key, (_stored, value) in drift.items():
+        DashboardCounter.objects.update_or_create(key=key, defaults={"value": value})
+    return drift
+
+
+def _remember_previous(sender, instance, **kwargs):
+    instance._counter_before = None
+    if instance.pk is None or instance._state.adding:
+        return
+    fields = COUNTED_MODELS[sender][0]
+    instance._counter_before = (
+        sender._base_manager.filter(pk=instance.pk).values_list(*fields).first()
+    )
+
+
+def _apply_save(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, "_counter_before", None)
+    record_change(sender, before, _instance_values(instance))
+
+
+def _apply_delete(sender, instance, **kwargs):
+    record_change(sender, _instance_values(instance), None)
+
+
+for _model in COUNTED_MODELS:
+    pre_save.connect(_remember_previous, sender=_model, dispatch_uid=f"counters-pre-{_model.__name__}")
+    post_save.connect(_apply_save, sender=_model, dispatch_uid=f"counters-post-{_model.__name__}")
+    post_delete.connect(_apply_delete, sender=_model, dispatch_uid=f"counters-del-{_model.__name__}")
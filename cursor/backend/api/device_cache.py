@@ -0,0 +1,137 @@
+"""
+In-process cache of serial number -> serialized device.
+
+Scanner-driven rental intake looks devices up by serial on every keystroke.
+This bounded LRU answers repeat lookups (including "no such serial") without
+touching the database. Entries are dropped from ``Device`` save/delete
+signals, again once the writing transaction commits, and after
+``DEVICE_CACHE_TTL`` seconds at the latest. The TTL is what bounds staleness
+for writes made by other worker processes.
+
+Code that changes devices with ``QuerySet.update()`` must call
+``invalidate()`` itself.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Device
+from .row_serializers import RowSerializer
+from .serializers import DeviceSerializer
+
+_row_serializer = RowSerializer(DeviceSerializer)
+
+
+class LRUCache:
+    """A thread-safe, size-bounded LRU mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(True, value)`` on a live hit, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_values(self, predicate):
+        """Drop every entry whose value matches ``predicate``."""
+        with self._lock:
+            for key in [key for key, (_expires, value) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_cache = LRUCache(
+    maxsize=getattr(settings, "DEVICE_CACHE_SIZE", 4096),
+    ttl=getattr(settings, "DEVICE_CACHE_TTL", 30),
+)
+
+
+def lookup(serials):
+    """
+    Resolve many serial numbers at once.
+
+    Returns ``{serial: device dict or None}``; cache misses are fetched with
+    a single ``serial_no IN (...)`` query and cached, misses included.
+    """
+    found = {}
+    missing = []
+    for serial in serials:
+        hit, value = _cache.get(serial)
+        if hit:
+            found[serial] = value
+        else:
+            missing.append(serial)
+
+    if missing:
+        rows = _row_serializer.rows(Device.objects.filter(serial_no__in=missing))
+        fetched = {device["serial_no"]: device for device in _row_serializer.serialize(rows)}
+        for serial in missing:
+            device = fetched.get(serial)
+            _cache.set(serial, device)
+            found[serial] = device
+    return found
+
+
+def get(serial):
+    """Return the serialized device with this serial number, or None."""
+    return lookup([serial])[serial]
+
+
+def invalidate(*serials):
+    for serial in serials:
+        _cache.discard(serial)
+
+
+def clear():
+    _cache.clear()
+
+
+def _forget(serial, pk):
+    _cache.discard(serial)
+    # Also catches entries cached under a serial number the device no longer has.
+    _cache.discard_values(lambda device: device is not None and device["id"] == pk)
+
+
+def _invalidate_device(sender, instance, **kwargs):
+    serial, pk = instance.serial_no, instance.pk
+    _forget(serial, pk)
+    # A concurrent reader may re-cache the pre-commit row; drop it again once committed.
+    transaction.on_commit(lambda: _forget(serial, pk))
+
+
+post_save.connect(_invalidate_device, sender=Device, dispatch_uid="device-cache-save")
+post_delete.connect(_invalidate_device, sender=Device, dispatch_uid="device-cache-delete")
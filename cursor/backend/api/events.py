@@ -0,0 +1,177 @@
+"""
+Domain events pushed to WebSocket clients.
+
+Writes to ``Job``, ``Rental``, ``Device`` and ``JobReport`` publish a typed
+event such as ``job.created``, ``job.claimed`` or ``rental.returned`` through
+the channel layer, so connected dashboards can patch their state in place
+instead of re-fetching lists. Events are sent only once the writing
+transaction commits, never for rolled-back writes, and carry the committed
+row in the same shape as the REST list endpoints (file URLs are relative,
+as there is no request to make them absolute). Deletions carry only the id.
+
+``NotificationConsumer.domain_event`` delivers them to clients as
+``{"type": "job.claimed", "id": 42, "data": {...}}``.
+
+Each event goes only to the sockets that show the row: rentals, devices
+and reports to admins (reports also to the job's assignee); jobs to
+everyone while they are open, since they are on every employee's
+available list, and otherwise to admins and the (previous) assignee. A
+user in several target groups may receive an event twice; clients apply
+events as idempotent upserts.
+
+Bulk ``QuerySet.update()`` / ``bulk_create()`` bypass signals; code that
+writes that way must call ``publish()`` or ``announce()`` itself.
+"""
+
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .consumers import EVERYONE, role_group, user_group
+from .models import Device, Job, JobReport, Rental
+from .row_serializers import RowSerializer
+from .serializers import DeviceSerializer, JobReportSerializer, JobSerializer, RentalSerializer
+
+GROUP_NAME = EVERYONE
+ADMINS = role_group(is_staff=True)
+
+
+def _job_event(before, after):
+    if before is None:
+        return "job.created"
+    (old_status, old_assignee), (new_status, new_assignee) = before, after
+    if new_status == "completed" and old_status != "completed":
+        return "job.completed"
+    if new_status == "in_progress" and old_status == "open":
+        return "job.claimed"
+    if new_assignee != old_assignee:
+        return "job.assigned"
+    return "job.updated"
+
+
+def _rental_event(before, after):
+    if before is None:
+        return "rental.created"
+    if after[0] == "returned" and before[0] != "returned":
+        return "rental.returned"
+    return "rental.updated"
+
+
+def _device_event(before, after):
+    return "device.created" if before is None else "device.updated"
+
+
+def _report_event(before, after):
+    return "report.submitted" if before is None else "report.updated"
+
+
+def _job_groups(instance, before):
+    old_status, old_assignee = before or (None, None)
+    if "open" in (instance.status, old_status):
+        return (EVERYONE,)
+    assignees = {instance.assigned_to_id, old_assignee} - {None}
+    return (ADMINS, *(user_group(user_id) for user_id in sorted(assignees)))
+
+
+def _admin_groups(instance, before):
+    return (ADMINS,)
+
+
+def _report_groups(instance, before):
+    assignee = Job.objects.filter(pk=instance.job_id).values_list("assigned_to_id", flat=True).first()
+    return (ADMINS,) if assignee is None else (ADMINS, user_group(assignee))
+
+
+# model -> (event prefix, serializer, fields the event type depends on,
+#           event type function, target groups function)
+PUBLISHED_MODELS = {
+    Job: ("job", JobSerializer, ("status", "assigned_to_id"), _job_event, _job_groups),
+    Rental: ("rental", RentalSerializer, ("status",), _rental_event, _admin_groups),
+    Device: ("device", DeviceSerializer, (), _device_event, _admin_groups),
+    JobReport: ("report", JobReportSerializer, (), _report_event, _report_groups),
+}
+
+_row_serializers = {
+    model: RowSerializer(serializer_class)
+    for model, (_prefix, serializer_class, *_rest) in PUBLISHED_MODELS.items()
+}
+
+
+def message(event, pk, data):
+    """
+    Build the channel layer message for one event. The client frame is
+    serialized here, once, rather than by each receiving consumer.
+    """
+    return {"type": "domain.event", "text": json.dumps({"type": event, "id": pk, "data": data})}
+
+
+def send(event, pk, data, groups=(EVERYONE,)):
+    """Send one event to the sockets in ``groups`` right now."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    payload = message(event, pk, data)
+    for group in groups:
+        async_to_sync(channel_layer.group_send)(group, payload)
+
+
+def _send_rows(event, model, pks, groups):
+    row_serializer = _row_serializers[model]
+    rows = row_serializer.rows(model._default_manager.filter(pk__in=pks).order_by("pk"))
+    for row in row_serializer.serialize(rows):
+        send(event, row["id"], row, groups)
+
+
+def publish(event, model, *pks, groups=(EVERYONE,)):
+    """
+    Publish ``event`` for the given rows of ``model`` to ``groups`` once the
+    current transaction commits, reading the rows in one query at that point.
+    """
+    if not pks:
+        return
+    # robust: a channel layer outage must not fail a write that already committed.
+    transaction.on_commit(lambda: _send_rows(event, model, pks, groups), robust=True)
+
+
+def announce(event, data, groups=(EVERYONE,)):
+    """
+    Publish an event about many rows at once, such as ``job.imported``,
+    once the current transaction commits. Clients refetch or resync with
+    ``?since=`` rather than patching rows in place.
+    """
+    transaction.on_commit(lambda: send(event, None, data, groups), robust=True)
+
+
+def _remember_previous(sender, instance, **kwargs):
+    instance._event_before = None
+    if instance.pk is None or instance._state.adding:
+        return
+    fields = PUBLISHED_MODELS[sender][2]
+    if not fields:
+        instance._event_before = ()
+        return
+    instance._event_before = (
+        sender._base_manager.filter(pk=instance.pk).values_list(*fields).first()
+    )
+
+
+def _publish_save(sender, instance, created, **kwargs):
+    _prefix, _serializer, fields, event_for, groups_for = PUBLISHED_MODELS[sender]
+    before = None if created else getattr(instance, "_event_before", None)
+    after = tuple(getattr(instance, name) for name in fields)
+    publish(event_for(before, after), sender, instance.pk, groups=groups_for(instance, before))
+
+
+def _publish_delete(sender, instance, **kwargs):
+    prefix, *_rest, groups_for = PUBLISHED_MODELS[sender]
+    event, pk, groups = f"{prefix}.deleted", instance.pk, groups_for(instance, None)
+    transaction.on_commit(lambda: send(event, pk, {"id": pk}, groups), robust=True)
+
+
+for _model, (_prefix, *_rest) in PUBLISHED_MODELS.items():
+    pre_save.connect(_remember_previous, sender=_model, dispatch_uid=f"events-pre-{_prefix}")
+    post_save.connect(_publish_save, sender=_model, dispatch_uid=f"events-save-{_prefix}")
+    post_delete.connect(_publish_delete, sender=_model, dispatch_uid=f"events-delete-{_prefix}")
@@ -0,0 +1,246 @@
+"""
+Post-processing for uploaded photos (``Rental.id_proof``,
+``JobReport.completion_photo``).
+
+Once an upload commits, a small thread pool (``IMAGE_WORKERS`` threads, or
+inline when 0) hashes the original and links the row to a
+``ProcessedImage``: a thumbnail and a web-sized JPEG, re-encoded with their
+orientation applied and all EXIF/GPS metadata dropped, stored under names
+derived from the content hash so they never change and can be cached
+forever. The original is re-encoded once the same way, in its own format
+(JPEG at high quality, anything else as PNG), and the row is pointed at that
+copy; the file as uploaded, metadata and all, is deleted. If another upload
+already had the same content, its variants and original are reused.
+
+Rental ID proofs are identity documents, so their variants go under
+``images/private/``, which ``api.media`` serves only with credentials, like
+the originals. ``make_private`` moves the variants of an image that was
+first stored as public.
+
+An upload Pillow cannot decode is recorded as a ``ProcessedImage`` with
+``error`` set and no variants, so it is not retried on every run. Other
+failures are logged and leave the row unprocessed; ``manage.py
+process_uploaded_images`` picks up anything left behind, including uploads
+from before this pipeline existed, and ``--retry-failed`` tries the
+undecodable ones again.
+"""
+
+import hashlib
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, pre_save
+from PIL import Image, ImageOps
+
+from . import versions
+from .models import JobReport, ProcessedImage, Rental
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 320
+WEB_SIZE = 1600
+
+# model -> (file field, ProcessedImage foreign key)
+PROCESSED_FIELDS = {
+    Rental: ("id_proof", "id_proof_image"),
+    JobReport: ("completion_photo", "completion_photo_image"),
+}
+
+# Models whose uploads are identity documents: variants under PRIVATE_PREFIX.
+PRIVATE_MODELS = {Rental}
+PRIVATE_PREFIX = "images/private/"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "IMAGE_WORKERS", 2), thread_name_prefix="images"
+            )
+    return _executor
+
+
+def content_hash(upload):
+    digest = hashlib.sha256()
+    with upload.open("rb"):
+        for chunk in upload.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _render(image, size, quality):
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.LANCZOS)
+    buffer = io.BytesIO()
+    variant.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _strip_metadata(image, source_format):
+    """The original without EXIF/GPS or other metadata, and its file extension."""
+    buffer = io.BytesIO()
+    icc_profile = image.info.get("icc_profile")
+    if source_format == "JPEG":
+        image.save(buffer, "JPEG", quality=95, icc_profile=icc_profile)
+        return ContentFile(buffer.getvalue()), "jpg"
+    if image.mode == "CMYK":
+        image = image.convert("RGB")
+    image.save(buffer, "PNG", icc_profile=icc_profile)
+    return ContentFile(buffer.getvalue()), "png"
+
+
+def _save_once(storage, name, content):
+    """Store ``content`` under exactly ``name``, keeping an existing copy."""
+    if not storage.exists(name):
+        saved = storage.save(name, content)
+        if saved != name:  # another worker stored it first
+            storage.delete(saved)
+    return name
+
+
+def make_private(processed):
+    """Move ``processed``'s variants under ``PRIVATE_PREFIX``. Returns True if any moved."""
+    storage = ProcessedImage._meta.get_field("web").storage
+    moved = {}
+    for field in ("thumbnail", "web"):
+        name = getattr(processed, field).name
+        if name and not name.startswith(PRIVATE_PREFIX):
+            with storage.open(name, "rb") as file:
+                moved[field] = (name, _save_once(storage, PRIVATE_PREFIX + name[len("images/"):], file))
+    if not moved:
+        return False
+    ProcessedImage.objects.filter(pk=processed.pk).update(**{field: new for field, (_old, new) in moved.items()})
+    # Responses embedding the old variant URLs must not be revalidated as current.
+    versions.bump("rental", "jobreport")
+    for field, (old, new) in moved.items():
+        setattr(processed, field, new)
+        storage.delete(old)
+    return True
+
+
+def variants_for(upload, private=False):
+    """
+    Return the ``ProcessedImage`` for this file, creating its variants if new.
+    With ``private``, the variants are stored (or moved) under ``PRIVATE_PREFIX``.
+    """
+    sha256 = content_hash(upload)
+    existing = ProcessedImage.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        if private:
+            make_private(existing)
+        return existing
+
+    with upload.open("rb"):
+        try:
+            source = Image.open(upload)
+            source_format = source.format
+            image = ImageOps.exif_transpose(source)
+            image.load()
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+            # Not an image Pillow can read: record it so it is not retried forever.
+            logger.warning("Upload %s is not a decodable image: %s", upload.name, exc)
+            processed, _created = ProcessedImage.objects.get_or_create(
+                sha256=sha256, defaults={"original": upload.name, "error": str(exc)[:255]},
+            )
+            return processed
+
+    root, _extension = posixpath.splitext(upload.name)
+    content, extension = _strip_metadata(image, source_format)
+    original = upload.storage.save(f"{root}-{sha256[:12]}.{extension}", content)
+    image = image.convert("RGB")
+    storage = ProcessedImage._meta.get_field("web").storage
+    prefix = f"{PRIVATE_PREFIX if private else 'images/'}{sha256[:2]}/{sha256}"
+    thumbnail = _save_once(storage, f"{prefix}-{THUMBNAIL_SIZE}.jpg", _render(image, THUMBNAIL_SIZE, 75))
+    web = _save_once(storage, f"{prefix}-{WEB_SIZE}.jpg", _render(image, WEB_SIZE, 82))
+    processed, created = ProcessedImage.objects.get_or_create(
+        sha256=sha256,
+        defaults={
+            "original": original,
+            "thumbnail": thumbnail,
+            "web": web,
+            "width": image.width,
+            "height": image.height,
+        },
+    )
+    if not created and processed.original != original:
+        upload.storage.delete(original)  # another worker stored it first
+    return processed
+
+
+def process(model, pk):
+    """Link one row's upload to its variants. Returns True if the row was updated."""
+    file_field, image_field = PROCESSED_FIELDS[model]
+    instance = model._default_manager.filter(pk=pk).first()
+    upload = getattr(instance, file_field, None)
+    if not upload:
+        return False
+    name = upload.name
+    processed = variants_for(upload, private=model in PRIVATE_MODELS)
+
+    duplicate = None
+    with transaction.atomic():
+        current = model._default_manager.select_for_update().filter(pk=pk).first()
+        if current is None or getattr(current, file_field).name != name:
+            return False  # deleted or replaced while we worked
+        setattr(current, image_field, processed)
+        update_fields = [image_field, "updated_at"]
+        if processed.original != name and upload.storage.exists(processed.original):
+            setattr(current, file_field, processed.original)
+            update_fields.append(file_field)
+            duplicate = name
+        current.save(update_fields=update_fields)
+    if duplicate is not None:
+        upload.storage.delete(duplicate)
+    return True
+
+
+def _process_logged(model, pk):
+    try:
+        process(model, pk)
+    except Exception:
+        logger.exception("Processing %s %s upload failed", model.__name__, pk)
+
+
+def _run_in_worker(model, pk):
+    # Worker threads keep their own connections; drop stale ones around each job.
+    close_old_connections()
+    try:
+        _process_logged(model, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule(model, pk):
+    if getattr(settings, "IMAGE_WORKERS", 2) <= 0:
+        _process_logged(model, pk)
+    else:
+        _get_executor().submit(_run_in_worker, model, pk)
+
+
+def _reset_on_new_upload(sender, instance, **kwargs):
+    file_field, image_field = PROCESSED_FIELDS[sender]
+    upload = getattr(instance, file_field)
+    if not upload or not upload._committed:  # cleared, or a new file being saved
+        setattr(instance, image_field, None)
+
+
+def _schedule_processing(sender, instance, **kwargs):
+    file_field, image_field = PROCESSED_FIELDS[sender]
+    if getattr(instance, file_field) and getattr(instance, f"{image_field}_id") is None:
+        pk = instance.pk
+        transaction.on_commit(lambda: schedule(sender, pk))
+
+
+for _model in PROCESSED_FIELDS:
+    pre_save.connect(_reset_on_new_upload, sender=_model, dispatch_uid=f"images-pre-{_model.__name__}")
+    post_save.connect(_schedule_processing, sender=_model, dispatch_uid=f"images-post-{_model.__name__}")
@@ -0,0 +1,306 @@
+"""
+Bulk import of devices and jobs from CSV or a JSON array.
+
+Input is parsed as a stream and handled in batches of ``IMPORT_BATCH_SIZE``
+rows. Each batch is validated with the model's regular serializer, reusing
+one serializer instance, and makes one query per unique field (e.g. every
+``serial_no`` in the batch at once) and one per related field, instead of
+one per row. Valid rows are inserted with ``bulk_create()`` in a
+transaction per batch. A batch that still hits a constraint (a concurrent
+insert) is retried row by row, so only the offending rows fail. The result
+is a per-row report, not all-or-nothing: ``{"created": n, "failed": n,
+"errors": [{"row": 3, "errors": {...}}]}``.
+
+``bulk_create()`` skips signal handlers, so each batch updates the
+dashboard counters, version stamps, device cache and search index itself.
+Once per import, a ``device.imported`` / ``job.imported`` event tells
+connected clients to refresh.
+"""
+
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from . import counters, device_cache, events, search, versions
+from .consumers import EVERYONE
+from .models import Device, Job
+
+READ_SIZE = 64 * 1024
+
+# model -> (event prefix, groups told about an import)
+ANNOUNCED_MODELS = {
+    Device: ("device", (events.ADMINS,)),
+    Job: ("job", (EVERYONE,)),
+}
+
+
+def parse_csv(chunks):
+    """Yield one dict per CSV record from an iterable of byte chunks; empty cells are omitted."""
+    lines = _lines(codecs.iterdecode(chunks, "utf-8-sig"))
+    for record in csv.DictReader(lines):
+        yield {key.strip(): value for key, value in record.items() if key and value not in (None, "")}
+
+
+def _lines(texts):
+    """Re-split decoded chunks into lines, keeping line endings, for the csv module."""
+    pending = ""
+    for text in texts:
+        pending += text
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+
+def parse_json_array(chunks):
+    """Yield the elements of a top-level JSON array, decoding it incrementally."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = finished = False
+    for text in codecs.iterdecode(chunks, "utf-8-sig"):
+        buffer += text
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if finished:
+                raise ParseError("Unexpected data after the JSON array.")
+            if not started:
+                if buffer[0] != "[":
+                    raise ParseError("Expected a JSON array of objects.")
+                buffer, started = buffer[1:], True
+            elif buffer[0] == ",":
+                buffer = buffer[1:]
+            elif buffer[0] == "]":
+                buffer, finished = buffer[1:], True
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    break  # incomplete; read more
+                if end == len(buffer) and not isinstance(item, (dict, list)):
+                    break  # a number or literal may continue in the next chunk
+                buffer = buffer[end:]
+                yield item
+    if buffer.strip() or not finished:
+        raise ParseError("Unterminated JSON array.")
+
+
+def parse(chunks, fmt):
+    if fmt == "csv":
+        return parse_csv(chunks)
+    if fmt == "json":
+        return parse_json_array(chunks)
+    raise ParseError("Unsupported import format; send CSV or a JSON array.")
+
+
+class _Preloaded:
+    """
+    Stands in for a related field's queryset while one batch is validated:
+    ``get(pk=...)`` answers from rows fetched for the whole batch at once.
+    """
+
+    def __init__(self, queryset, values):
+        self.model = queryset.model
+        to_python = self.model._meta.pk.to_python
+        pks = set()
+        for value in values:
+            try:
+                pks.add(to_python(value))
+            except DjangoValidationError:
+                pass
+        self.objects = queryset.in_bulk(pks) if pks else {}
+
+    def get(self, pk):
+        try:
+            key = self.model._meta.pk.to_python(pk)
+        except DjangoValidationError:
+            raise ValueError(pk)
+        try:
+            return self.objects[key]
+        except KeyError:
+            raise self.model.DoesNotExist
+
+
+class Importer:
+    """Validate and insert rows for one serializer, accumulating a report."""
+
+    def __init__(self, serializer_class, batch_size=None, context=None):
+        self.serializer = serializer_class(context=context or {})
+        self.model = serializer_class.Meta.model
+        self.batch_size = batch_size or getattr(settings, "IMPORT_BATCH_SIZE", 500)
+        self.unique_fields = []
+        self.related_fields = []
+        for field in self.serializer.fields.values():
+            if field.read_only:
+                continue
+            unique = [v for v in field.validators if isinstance(v, UniqueValidator)]
+            if unique:
+                field.validators = [v for v in field.validators if v not in unique]
+                self.unique_fields.append(field)
+            if isinstance(field, PrimaryKeyRelatedField):
+                self.related_fields.append((field, field.queryset))
+        self.seen = {field.source: set() for field in self.unique_fields}
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch = []
+        number = 0
+        try:
+            for number, row in enumerate(rows, start=1):
+                batch.append((number, row))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+        except (ParseError, UnicodeDecodeError, csv.Error) as exc:
+            # Keep the rows read so far; report where the input broke off.
+            detail = exc.detail if isinstance(exc, ParseError) else str(exc)
+            self._fail(number + 1, {"non_field_errors": [detail]})
+        if batch:
+            self._import_batch(batch)
+        if self.created and self.model in ANNOUNCED_MODELS:
+            prefix, groups = ANNOUNCED_MODELS[self.model]
+            events.announce(f"{prefix}.imported", {"count": self.created}, groups)
+        return self.report()
+
+    def report(self):
+        errors = sorted(self.errors, key=lambda error: error["row"])
+        return {"created": self.created, "failed": len(errors), "errors": errors}
+
+    def _fail(self, number, errors):
+        self.errors.append({"row": number, "errors": errors})
+
+    def _import_batch(self, batch):
+        valid = self._validate(batch)
+        if not valid:
+            return
+        try:
+            with transaction.atomic():
+                self._insert([instance for _number, instance in valid])
+            self.created += len(valid)
+        except IntegrityError:
+            # Someone inserted a conflicting row meanwhile: find it row by row.
+            for number, instance in valid:
+                try:
+                    with transaction.atomic():
+                        self._insert([instance])
+                    self.created += 1
+                except IntegrityError as exc:
+                    self._fail(number, {"non_field_errors": [str(exc)]})
+
+    def _validate(self, batch):
+        objects = [(number, row) for number, row in batch if isinstance(row, dict)]
+        for number, row in batch:
+            if not isinstance(row, dict):
+                self._fail(number, {"non_field_errors": ["Expected an object."]})
+
+        for field, queryset in self.related_fields:
+            values = [row[field.field_name] for _number, row in objects if row.get(field.field_name) not in (None, "")]
+            field.queryset = _Preloaded(queryset, values)
+
+        validated = []
+        try:
+            for number, row in objects:
+                try:
+                    validated.append((number, self.serializer.run_validation(row)))
+                except ValidationError as exc:
+                    self._fail(number, exc.detail)
+        finally:
+            for field, queryset in self.related_fields:
+                field.queryset = queryset
+
+        for field in self.unique_fields:
+            values = {data[field.source] for _number, data in validated if data.get(field.source) is not None}
+            taken = set(
+                self.model._default_manager.filter(**{f"{field.source}__in": values})
+                .values_list(field.source, flat=True)
+            ) if values else set()
+            message = f"{self.model._meta.verbose_name} with this {field.source} already exists."
+            kept = []
+            for number, data in validated:
+                value = data.get(field.source)
+                if value is not None and (value in taken or value in self.seen[field.source]):
+                    self._fail(number, {field.field_name: [message]})
+                    continue
+                if value is not None:
+                    self.seen[field.source].add(value)
+                kept.append((number, data))
+            validated = kept
+
+        return [(number, self.model(**data)) for number, data in validated]
+
+    def _insert(self, instances):
+        manager = self.model._default_manager
+        # MySQL does not return the ids of bulk-inserted rows; remember where they start.
+        last_pk = manager.aggregate(last=Max("pk"))["last"] or 0
+        manager.bulk_create(instances)
+        # bulk_create() skips the signal handlers that keep derived state in sync.
+        counters.record_created(instances)
+        versions.bump(versions.VERSIONED_MODELS[self.model])
+        if self.model is Device:
+            serials = [device.serial_no for device in instances]
+            device_cache.invalidate(*serials)
+            transaction.on_commit(lambda: device_cache.invalidate(*serials))
+        if self.model in search.INDEXED_MODELS:
+            search.reindex(manager.filter(pk__gt=last_pk))
+
+
+def format_of(name, content_type):
+    name, content_type = (name or "").lower(), (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith(".json") or "json" in content_type:
+        return "json"
+    return None
+
+
+class BulkImportMixin:
+    """
+    ``POST <list>/import/``: admins upload a CSV or JSON array, either as a
+    multipart ``file`` or as the raw request body.
+    """
+
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {"error": "Only admins can import records"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        content_type = request.content_type or ""
+        if content_type.startswith("multipart/"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                raise ValidationError({"file": "Upload a CSV or JSON file."})
+            fmt = format_of(upload.name, upload.content_type)
+            chunks = upload.chunks()
+        else:
+            # Read the raw body as it arrives instead of through a parser.
+            fmt = format_of("", content_type)
+            stream = request.stream
+            chunks = iter(lambda: stream.read(READ_SIZE), b"") if stream is not None else iter(())
+
+        importer = Importer(self.get_serializer_class(), context=self.get_serializer_context())
+        report = importer.run(parse(chunks, fmt))
+        if report["created"]:
+            response_status = status.HTTP_201_CREATED
+        elif report["failed"]:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report, status=response_status)
@@ -0,0 +1,182 @@
+"""
+Structured logging with the I/O off the request thread.
+
+``QueuedHandler`` is the handler ``settings.LOGGING`` attaches to every
+logger. A request thread only appends the record to an in-memory queue. A
+``QueueListener`` thread then formats it and writes it to a size-rotated
+file and, optionally, the console. Formatting is lazy: ``%``-style
+arguments and ``extra`` fields are rendered on the listener thread, and a
+record dropped by a level or sampling filter is never rendered at all.
+Because arguments are rendered after the logging call returns, pass values
+rather than objects the request goes on to change.
+
+``JsonFormatter`` writes one JSON object per line: time, level, logger,
+message and every ``extra`` field. Extras go through ``redact()``: secrets
+are masked, uploads and binary data are reduced to their size, and long
+strings and collections are truncated. The file rotates at
+``LOG_MAX_BYTES`` and keeps ``LOG_BACKUP_COUNT`` old files. Rotation is not
+coordinated across processes, so give each worker process its own
+``LOG_FILE``.
+
+``SamplingFilter`` keeps one in N records of the high-volume events named
+in ``LOG_SAMPLE_RATES`` (records logged with ``extra={"event": ...}``).
+Kept records carry ``"sample_rate": N``. Warnings and errors are never
+sampled. If the listener falls ``LOG_QUEUE_SIZE`` records behind, new
+records are dropped instead of blocking requests. The next record that
+gets through reports the loss as ``"records_dropped"``.
+
+This module is imported while settings are configured, before the app
+registry is ready, so it must not import models.
+"""
+
+import itertools
+import json
+import logging
+import queue
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.core.files import File
+
+MAX_STRING_LENGTH = 256
+MAX_ITEMS = 50
+MAX_DEPTH = 4
+# Keys whose values are masked wherever they appear (substring match, any case).
+SENSITIVE_KEYS = ("password", "token", "secret", "authorization", "cookie", "key")
+
+TEXT_FORMAT = "{levelname} {asctime} {module} {message}"
+
+# Attributes every LogRecord has; anything else was passed as ``extra``.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def _sensitive(key):
+    key = str(key).lower()
+    return any(word in key for word in SENSITIVE_KEYS)
+
+
+def redact(value, depth=0):
+    """A small, JSON-ready, secret-free rendering of ``value`` for a log record."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) <= MAX_STRING_LENGTH:
+            return value
+        return f"{value[:MAX_STRING_LENGTH]}... ({len(value)} chars)"
+    if isinstance(value, File):
+        # Uploads: never read the content.
+        return {"file": value.name, "size": value.size, "content_type": getattr(value, "content_type", None)}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if depth >= MAX_DEPTH:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, Mapping):
+        items = list(value.items())
+        redacted = {
+            str(key): "[redacted]" if _sensitive(key) else redact(item, depth + 1)
+            for key, item in items[:MAX_ITEMS]
+        }
+        if len(items) > MAX_ITEMS:
+            redacted["..."] = f"{len(items) - MAX_ITEMS} more"
+        return redacted
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        redacted = [redact(item, depth + 1) for item in items[:MAX_ITEMS]]
+        if len(items) > MAX_ITEMS:
+            redacted.append(f"... {len(items) - MAX_ITEMS} more")
+        return redacted
+    return redact(str(value), depth)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, ``extra`` fields included and redacted."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = "[redacted]" if _sensitive(key) else redact(value)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in ``rates[event]`` records of each sampled event."""
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = {event: rate for event, rate in (rates or {}).items() if rate > 1}
+        self._seen = {event: itertools.count() for event in self.rates}
+
+    def filter(self, record):
+        event = getattr(record, "event", None)
+        if event not in self.rates or record.levelno >= logging.WARNING:
+            return True
+        # next() on a count() is atomic, so request threads need no lock.
+        if next(self._seen[event]) % self.rates[event]:
+            return False
+        record.sample_rate = self.rates[event]
+        return True
+
+
+class QueuedHandler(QueueHandler):
+    """
+    Queue records for a listener thread that writes them as JSON lines to a
+    size-rotated ``filename`` and, with ``console`` set to ``"text"`` or
+    ``"json"``, to stderr, plus any ready-made ``handlers``.
+    """
+
+    def __init__(
+        self, filename=None, max_bytes=10 * 1024 * 1024, backup_count=5, console="text", queue_size=10000,
+        handlers=(),
+    ):
+        super().__init__(queue.Queue(queue_size))
+        targets = list(handlers)
+        if filename:
+            file_handler = RotatingFileHandler(
+                filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True,
+            )
+            file_handler.setFormatter(JsonFormatter())
+            targets.append(file_handler)
+        if console in ("text", "json"):
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(
+                JsonFormatter() if console == "json" else logging.Formatter(TEXT_FORMAT, style="{")
+            )
+            targets.append(console_handler)
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, *targets)
+        self.listener.start()
+
+    def prepare(self, record):
+        # QueueHandler would render the message here, on the request thread.
+        return record
+
+    def enqueue(self, record):
+        dropped, self.dropped = self.dropped, 0
+        if dropped:
+            record.records_dropped = dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped = dropped + 1
+
+    def close(self):
+        # logging.shutdown() calls this at exit: write out what is queued.
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        super().close()
@@ -0,0 +1,112 @@
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api import counters
+from api.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent POST /api/jobs/<id>/claim/ requests through the full "
+        "Django stack, one round per job, and check that each job has exactly "
+        "one winner and every other claimant gets 409. Reports throughput "
+        "per round so degradation over the run shows up. Uses throwaway "
+        "employees and jobs, deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=20, help="Rounds, one fresh open job each (default 20).")
+        parser.add_argument("--claims", type=int, default=200, help="Parallel claims per job (default 200).")
+        parser.add_argument("--threads", type=int, default=32, help="Client threads (default 32).")
+        parser.add_argument("--employees", type=int, default=50, help="Distinct claiming users (default 50).")
+
+    def handle(self, *args, **options):
+        users = [
+            User.objects.create_user(username=f"bench-claim-{n}@example.com")
+            for n in range(options["employees"])
+        ]
+        tokens = [Token.objects.create(user=user).key for user in users]
+        jobs = []
+        # Every losing claim is a 409, which django.request would log as a warning.
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            self.run(options, tokens, jobs)
+        finally:
+            request_logger.setLevel(level)
+            Job.objects.filter(pk__in=jobs).delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run(self, options, tokens, jobs):
+        local = threading.local()
+
+        def claim(job_id, n):
+            if not hasattr(local, "client"):
+                # The default "testserver" host is not in ALLOWED_HOSTS.
+                local.client = Client(SERVER_NAME="localhost")
+            token = tokens[n % len(tokens)]
+            response = local.client.post(f"/api/jobs/{job_id}/claim/", HTTP_AUTHORIZATION=f"Token {token}")
+            return response.status_code
+
+        def claim_with_fresh_connection(job_id, n):
+            try:
+                return claim(job_id, n)
+            finally:
+                close_old_connections()
+
+        ok = True
+        rates = []
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            for round_number in range(1, options["jobs"] + 1):
+                job = Job.objects.create(
+                    customer_name="Claim benchmark",
+                    phone_number="0",
+                    location="-",
+                    issue="-",
+                    work_date=timezone.localdate(),
+                )
+                jobs.append(job.pk)
+
+                started = time.perf_counter()
+                codes = list(pool.map(claim_with_fresh_connection, [job.pk] * options["claims"], range(options["claims"])))
+                elapsed = time.perf_counter() - started
+                rates.append(options["claims"] / elapsed)
+
+                won = codes.count(200)
+                lost = codes.count(409)
+                job.refresh_from_db()
+                winner_ok = (
+                    won == 1 and lost == len(codes) - 1
+                    and job.status == "in_progress" and job.assigned_to_id is not None
+                )
+                ok &= winner_ok
+                if not winner_ok or round_number in (1, options["jobs"]):
+                    other = sorted({code for code in codes if code not in (200, 409)})
+                    self.stdout.write(
+                        f"round {round_number}: {won} won, {lost} got 409"
+                        + (f", other statuses {other}" if other else "")
+                        + f", {rates[-1]:.0f} claims/s"
+                    )
+
+        half = max(1, len(rates) // 2)
+        self.stdout.write(
+            f"throughput: median {statistics.median(rates):.0f} claims/s, "
+            f"first half {statistics.mean(rates[:half]):.0f}, last half {statistics.mean(rates[half:] or rates):.0f}"
+        )
+        drift = counters.check()
+        if drift:
+            ok = False
+            self.stdout.write(f"dashboard counters drifted: {drift}")
+        style = self.style.SUCCESS if ok else self.style.ERROR
+        self.stdout.write(style(f"exactly one winner per job: {ok}"))
@@ -0,0 +1,139 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Device, Job, JobReport, Rental
+from api.row_serializers import RowSerializer
+from api.serializers import DeviceSerializer, JobReportSerializer, JobSerializer, RentalSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark list serialization: DRF ModelSerializer (with and without "
+        "select_related) against the precompiled RowSerializer path, and check "
+        "that both render byte-identical JSON. Runs inside a transaction that "
+        "is rolled back, so no data is left behind."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Rows per model (default 10000).")
+        parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing runs (default 3).")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        request = RequestFactory().get("/api/", HTTP_HOST="localhost")
+        renderer = JSONRenderer()
+
+        with transaction.atomic():
+            self._populate(rows)
+
+            cases = [
+                ("jobs", Job.objects.order_by("-created_at"), JobSerializer, ("assigned_to",)),
+                ("rentals", Rental.objects.order_by("-created_at"), RentalSerializer, ("device", "id_proof_image")),
+                ("devices", Device.objects.order_by("model"), DeviceSerializer, ()),
+                ("reports", JobReport.objects.order_by("-created_at"), JobReportSerializer, ("completion_photo_image",)),
+            ]
+            for label, queryset, serializer_class, related in cases:
+                def drf(qs=queryset):
+                    data = serializer_class(qs.all(), many=True, context={"request": request}).data
+                    return renderer.render(data)
+
+                def drf_eager(qs=queryset):
+                    return drf(qs.select_related(*related))
+
+                row_serializer = RowSerializer(serializer_class)
+
+                def fast(qs=queryset):
+                    return renderer.render(row_serializer.serialize(row_serializer.rows(qs.all()), request))
+
+                results = {}
+                for name, fn in (("drf", drf), ("drf+select_related", drf_eager), ("row", fast)):
+                    results[name] = self._measure(fn, repeat)
+
+                identical = len({output for output, _, _ in results.values()}) == 1
+                baseline = results["drf"][1]
+                self.stdout.write(f"\n{label} ({rows} rows, {len(results['row'][0]):,} bytes)")
+                for name, (_output, seconds, queries) in results.items():
+                    self.stdout.write(
+                        f"  {name:<20} {seconds * 1000:9.1f} ms  {queries:6d} queries  "
+                        f"x{baseline / seconds:5.1f}"
+                    )
+                style = self.style.SUCCESS if identical else self.style.ERROR
+                self.stdout.write(style(f"  byte-identical JSON: {identical}"))
+
+            transaction.set_rollback(True)
+
+    def _measure(self, fn, repeat):
+        best = None
+        for _ in range(repeat):
+            queries = []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                start = time.perf_counter()
+                output = fn()
+                elapsed = time.perf_counter() - start
+            if best is None or elapsed < best[1]:
+                best = (output, elapsed, len(queries))
+        return best
+
+    def _populate(self, rows):
+        users = [
+            User.objects.create_user(username=f"bench-{i}@example.com", email=f"bench-{i}@example.com", is_staff=i == 0)
+            for i in range(20)
+        ]
+        today = date.today()
+        Job.objects.bulk_create(
+            Job(
+                customer_name=f"Customer {i}",
+                phone_number="555-0100",
+                location=f"Site {i % 50}",
+                issue="Printer jams on every second page",
+                work_date=today + timedelta(days=i % 30),
+                priority=("low", "medium", "high")[i % 3],
+                status=("open", "in_progress", "completed")[i % 3],
+                assigned_to=users[i % len(users)] if i % 3 else None,
+            )
+            for i in range(rows)
+        )
+        # bulk_create() does not return primary keys on every backend (MySQL), so re-read them.
+        job_ids = list(Job.objects.order_by("-id").values_list("id", flat=True)[:rows])
+        Device.objects.bulk_create(
+            Device(device_name=f"Device {i}", serial_no=f"BENCH-{i:07d}", model=f"Model {i % 40}")
+            for i in range(rows)
+        )
+        device_ids = list(Device.objects.order_by("-id").values_list("id", flat=True)[:rows])
+        Rental.objects.bulk_create(
+            Rental(
+                customer_name=f"Renter {i}",
+                phone_number="555-0101",
+                device_serial=f"BENCH-{i:07d}",
+                device_id=device_ids[i],
+                from_date=today,
+                to_date=today + timedelta(days=7),
+                rental_days=7,
+                security_deposit=Decimal("1500.00"),
+                id_proof=f"rentals/id-{i}.jpg" if i % 2 else "",
+            )
+            for i in range(rows)
+        )
+        JobReport.objects.bulk_create(
+            JobReport(
+                job_id=job_ids[i],
+                company_name=f"Customer {i}",
+                time_taken="2 hours",
+                equipment_used="Toolkit",
+                work_description="Replaced the fuser unit",
+                completion_photo=f"job_reports/photo-{i}.jpg" if i % 2 else None,
+            )
+            for i in range(rows)
+        )
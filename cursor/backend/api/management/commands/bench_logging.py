@@ -0,0 +1,116 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+from api.logs import TEXT_FORMAT, JsonFormatter, QueuedHandler
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class SlowFileHandler(logging.FileHandler):
+    """A FileHandler on a disk that takes ``delay`` seconds per write."""
+
+    def __init__(self, filename, delay):
+        super().__init__(filename, encoding="utf-8")
+        self.delay = delay
+
+    def emit(self, record):
+        if self.delay:
+            time.sleep(self.delay)
+        super().emit(record)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what logging one rental creation costs the request thread: "
+        "the previous setup (f-strings of the whole request.data and "
+        "request.FILES written synchronously to a FileHandler) against "
+        "api.logs (one lazy record queued for the JSON writer thread), "
+        "with logging disabled as the baseline. --io-delay-ms simulates "
+        "a slow disk. Console output is left out of both setups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Simulated requests (default 2000).")
+        parser.add_argument("--io-delay-ms", type=float, default=0, help="Added latency per file write (default 0).")
+        parser.add_argument("--upload-kb", type=int, default=512, help="Size of the ID proof upload (default 512).")
+
+    def handle(self, *args, **options):
+        data = QueryDict(mutable=True)
+        data.update({
+            "customer_name": "Priya Kumar",
+            "phone_number": "+91 98765 43210",
+            "device_serial": "SN-PRJ-0001",
+            "from_date": "2026-10-20",
+            "to_date": "2026-10-27",
+            "rental_days": "7",
+            "security_deposit": "5000.00",
+            "notes": "Customer asked for a spare lamp and HDMI cable. " * 40,
+        })
+        files = MultiValueDict({
+            "id_proof": [SimpleUploadedFile("id.png", b"\x89PNG" + b"\0" * (options["upload_kb"] * 1024), "image/png")],
+        })
+        delay = options["io_delay_ms"] / 1000
+
+        logger = logging.getLogger("bench_logging")
+        logger.propagate = False
+
+        def before():
+            logger.info(f"Creating rental with data: {data}")
+            logger.info(f"Files: {files}")
+
+        def after():
+            logger.info("Creating rental", extra={"event": "rental.create", "data": data, "files": files})
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = [("disabled", self.measure(logger, [], after, options))]
+
+            sync_handler = SlowFileHandler(os.path.join(directory, "before.log"), delay)
+            sync_handler.setFormatter(logging.Formatter(TEXT_FORMAT, style="{"))
+            results.append(("before: sync FileHandler", self.measure(logger, [sync_handler], before, options)))
+            sync_handler.close()
+
+            writer = SlowFileHandler(os.path.join(directory, "after.log"), delay)
+            writer.setFormatter(JsonFormatter())
+            queued = QueuedHandler(console=None, queue_size=options["requests"] + 1, handlers=[writer])
+            started = time.perf_counter()
+            results.append(("after: queued JSON", self.measure(logger, [queued], after, options)))
+            queued.close()
+            drained = time.perf_counter() - started
+
+            sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in ("before.log", "after.log")}
+
+        self.stdout.write(f"{options['requests']} requests, upload {options['upload_kb']} KB, io delay {options['io_delay_ms']} ms")
+        for name, latencies in results:
+            self.stdout.write(
+                f"{name:26} p50 {statistics.median(latencies) * 1e6:8.1f} us   "
+                f"p99 {percentile(latencies, 99) * 1e6:8.1f} us   max {max(latencies) * 1e6:9.1f} us"
+            )
+        self.stdout.write(f"queued writer finished {drained:.2f} s after the first request")
+        self.stdout.write(
+            f"bytes per request: before {sizes['before.log'] / options['requests']:.0f}, "
+            f"after {sizes['after.log'] / options['requests']:.0f}"
+        )
+
+    def measure(self, logger, handlers, log, options):
+        logger.handlers = handlers
+        logger.setLevel(logging.INFO if handlers else logging.WARNING)
+        latencies = []
+        try:
+            for _n in range(options["requests"]):
+                started = time.perf_counter()
+                log()
+                latencies.append(time.perf_counter() - started)
+        finally:
+            logger.handlers = []
+        return latencies
@@ -0,0 +1,112 @@
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from api import counters
+
+PASSWORD = "bench-login-password"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent POST /api/auth/login/ requests for throwaway users "
+        "(emails in mixed case, to exercise the case-insensitive lookup) and "
+        "report queries per login and latency percentiles. Password hashing "
+        "dominates the latency; --fast-hasher swaps in MD5 to expose the "
+        "database part. The users are created and deleted through the ORM, "
+        "so the dashboard counters follow them; any counter drift found "
+        "afterwards is reported, not repaired (see rebuild_dashboard_counters)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="Distinct accounts (default 200).")
+        parser.add_argument("--logins", type=int, default=1000, help="Login requests in total (default 1000).")
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent clients (default 16).")
+        parser.add_argument(
+            "--fast-hasher", action="store_true",
+            help="Store the passwords with MD5 so hashing does not hide the query cost.",
+        )
+
+    def handle(self, *args, **options):
+        if options["fast_hasher"]:
+            with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]):
+                self.bench(options)
+        else:
+            self.bench(options)
+
+    def bench(self, options):
+        hashed = make_password(PASSWORD)
+        # Failed logins would be logged one by one by django.request.
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            # Leftovers of an interrupted run, then one save() per user: bulk_create()
+            # would skip the signals that keep the user counters.
+            User.objects.filter(username__startswith="bench-login-").delete()
+            users = [
+                User.objects.create(username=f"bench-login-{n}", email=f"Bench.Login.{n}@Example.com", password=hashed)
+                for n in range(options["users"])
+            ]
+            self.run(options, [user.email.lower() for user in users])
+        finally:
+            request_logger.setLevel(level)
+            User.objects.filter(username__startswith="bench-login-").delete()
+            # Read-only: a benchmark must not rewrite the live counters.
+            drift = counters.check()
+            if drift:
+                self.stdout.write(f"dashboard counters drifted: {drift}")
+
+    def run(self, options, emails):
+        local = threading.local()
+
+        def login(n):
+            if not hasattr(local, "client"):
+                # The default "testserver" host is not in ALLOWED_HOSTS.
+                local.client = Client(SERVER_NAME="localhost")
+            email = emails[n % len(emails)]
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = local.client.post(
+                        "/api/auth/login/", {"email": email, "password": PASSWORD}, content_type="application/json",
+                    )
+                    elapsed = time.perf_counter() - started
+            finally:
+                close_old_connections()
+            return response.status_code, elapsed, len(queries)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            results = list(pool.map(login, range(options["logins"])))
+        total = time.perf_counter() - started
+
+        codes = [code for code, _elapsed, _queries in results]
+        latencies = [elapsed for _code, elapsed, _queries in results]
+        queries = [count for _code, _elapsed, count in results]
+        # The first login of each user creates its token; report steady state separately.
+        steady = queries[len(emails):] or queries
+        self.stdout.write(f"logins: {len(results)} in {total:.2f} s ({len(results) / total:.0f}/s), statuses {sorted(set(codes))}")
+        self.stdout.write(
+            f"queries per login: {statistics.mean(steady):.2f} (first login per user {statistics.mean(queries[:len(emails)]):.2f})"
+        )
+        self.stdout.write(
+            f"latency: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+        )
+        style = self.style.SUCCESS if set(codes) == {200} else self.style.ERROR
+        self.stdout.write(style(f"all logins succeeded: {set(codes) == {200}}"))
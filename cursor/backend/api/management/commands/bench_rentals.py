@@ -0,0 +1,149 @@
+import datetime
+import logging
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api import counters
+from api.models import Device, Rental
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress rental intake: for each of --devices throwaway devices, fire "
+        "--requests concurrent POST /api/rentals/ for the same serial number, "
+        "each for a random date range in the next --days days, then return "
+        "every booked rental with as many concurrent requests. Checks that "
+        "no two bookings of a device overlap, that every 409 clashed with a "
+        "booking, that each rental was returned exactly once and the device "
+        "ends up available, and that dashboard counters did not drift. "
+        "Reports request latency percentiles; long lock waits show up as a "
+        "long p99 tail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--devices", type=int, default=20, help="Devices, one round each (default 20).")
+        parser.add_argument("--requests", type=int, default=100, help="Concurrent requests per device (default 100).")
+        parser.add_argument("--threads", type=int, default=32, help="Client threads (default 32).")
+        parser.add_argument("--days", type=int, default=60, help="Spread of the booked dates (default 60).")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the date ranges (default 0).")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username="bench-rentals@example.com", is_staff=True)
+        token = Token.objects.create(user=user).key
+        devices = [
+            Device.objects.create(serial_no=f"BENCH-RENTAL-{user.pk}-{n}", model="Benchmark")
+            for n in range(options["devices"])
+        ]
+        # Losing requests are 4xx, which django.request would log one by one.
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            self.run(options, token, devices)
+        finally:
+            request_logger.setLevel(level)
+            Rental.objects.filter(device__in=devices).delete()
+            Device.objects.filter(pk__in=[device.pk for device in devices]).delete()
+            user.delete()
+
+    def run(self, options, token, devices):
+        local = threading.local()
+        headers = {"HTTP_AUTHORIZATION": f"Token {token}"}
+        today = timezone.localdate()
+        rng = random.Random(options["seed"])
+
+        def timed(method, path, data=None):
+            if not hasattr(local, "client"):
+                # The default "testserver" host is not in ALLOWED_HOSTS.
+                local.client = Client(SERVER_NAME="localhost")
+            started = time.perf_counter()
+            try:
+                response = getattr(local.client, method)(path, data, **headers)
+            finally:
+                close_old_connections()
+            return response.status_code, time.perf_counter() - started
+
+        def rent(device, start, end):
+            return timed("post", "/api/rentals/", {
+                "customer_name": "Rental benchmark",
+                "phone_number": "0",
+                "device_serial": device.serial_no,
+                "from_date": start.isoformat(),
+                "to_date": end.isoformat(),
+                "rental_days": (end - start).days + 1,
+                "security_deposit": "0.00",
+            })
+
+        def random_range():
+            start = today + datetime.timedelta(days=rng.randrange(options["days"]))
+            return start, start + datetime.timedelta(days=rng.randrange(7))
+
+        ok = True
+        latencies = {"rent": [], "return": []}
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            for device in devices:
+                ranges = [random_range() for _n in range(options["requests"])]
+                results = list(pool.map(lambda r: rent(device, *r), ranges))
+                latencies["rent"] += [elapsed for _code, elapsed in results]
+                codes = [code for code, _elapsed in results]
+                booked = list(Rental.objects.filter(device=device).values_list("pk", "from_date", "to_date"))
+                intervals = sorted((start, end) for _pk, start, end in booked)
+                overlapping = [
+                    (first, second) for first, second in zip(intervals, intervals[1:]) if second[0] <= first[1]
+                ]
+                # A rejected request must have clashed with a booking that was made.
+                wrongly_rejected = [
+                    (start, end)
+                    for (start, end), code in zip(ranges, codes)
+                    if code == 409 and not any(s <= end and start <= e for s, e in intervals)
+                ]
+                other = sorted({code for code in codes if code not in (201, 409)})
+                if overlapping or wrongly_rejected or other or codes.count(201) != len(booked):
+                    ok = False
+                    self.stdout.write(
+                        f"{device.serial_no}: statuses {sorted(set(codes))}, {len(booked)} rentals, "
+                        f"{len(overlapping)} overlapping, {len(wrongly_rejected)} wrongly rejected"
+                    )
+                    continue
+
+                # Every rental gets returned, each by several racing requests.
+                paths = [f"/api/rentals/{pk}/return/" for pk, _start, _end in booked]
+                paths = [paths[n % len(paths)] for n in range(max(options["requests"], len(paths)))]
+                results = list(pool.map(lambda path: timed("post", path), paths))
+                latencies["return"] += [elapsed for _code, elapsed in results]
+                codes = [code for code, _elapsed in results]
+                device.refresh_from_db()
+                returned = codes.count(200) == len(booked) and codes.count(400) == len(codes) - len(booked)
+                if not returned or device.availability != "available":
+                    ok = False
+                    self.stdout.write(
+                        f"{device.serial_no}: return statuses {sorted(set(codes))}, device {device.availability}"
+                    )
+
+        for name, values in latencies.items():
+            if values:
+                self.stdout.write(
+                    f"{name}: {len(values)} requests, p50 {statistics.median(values) * 1000:.1f} ms, "
+                    f"p99 {percentile(values, 99) * 1000:.1f} ms, max {max(values) * 1000:.1f} ms"
+                )
+        drift = counters.check()
+        if drift:
+            ok = False
+            self.stdout.write(f"dashboard counters drifted: {drift}")
+        style = self.style.SUCCESS if ok else self.style.ERROR
+        self.stdout.write(style(f"no overlapping bookings, every rental returned exactly once: {ok}"))
@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api import search, versions
+from api.models import Job, SearchTerm
+
+FIRST_NAMES = [
+    "Arun", "Priya", "Karthik", "Divya", "Suresh", "Lakshmi", "Vijay", "Meena", "Rahul", "Anitha",
+    "Ganesh", "Kavya", "Mohan", "Revathi", "Senthil", "Deepa", "Ravi", "Sangeetha", "Ashok", "Nithya",
+]
+LAST_NAMES = ["Kumar", "Raman", "Krishnan", "Subramanian", "Iyer", "Pillai", "Reddy", "Nair", "Sharma", "Menon"]
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Salem", "Trichy", "Vellore", "Erode", "Tirunelveli", "Hosur", "Karur"]
+ISSUE_WORDS = [
+    "printer", "paper", "jam", "laptop", "battery", "screen", "flicker", "router", "wifi", "drops",
+    "projector", "lamp", "overheating", "keyboard", "missing", "keys", "server", "fan", "noise", "backup",
+    "failed", "scanner", "toner", "replacement", "network", "cable", "damaged", "ups", "beeping", "slow",
+]
+QUERIES = ["priya", "chennai", "madu", "printer jam", "laptop battery screen", "kumar vellore", "toner", "98"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed throwaway jobs with generated names, places and issues, index "
+        "them, and time GET /api/search/ for a mix of one-word, prefix and "
+        "multi-word queries through the full Django stack. The seed rows are "
+        "written and removed in bulk, outside the signal handlers, and never "
+        "touch the dashboard counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=100_000, help="Jobs to seed (default 100000).")
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per query (default 20).")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for the generated rows.")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username="bench-search", is_staff=True)
+        token = Token.objects.create(user=user).key
+        first_pk = (Job.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        try:
+            self.seed(options)
+            self.run(options, token)
+        finally:
+            with transaction.atomic():
+                seeded = Job.objects.filter(pk__gte=first_pk, location__endswith="(bench)")
+                SearchTerm.objects.filter(model="job", object_id__in=seeded.values("pk")).delete()
+                seeded._raw_delete(seeded.db)
+                versions.bump("job")
+            user.delete()
+
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        today = timezone.localdate()
+        started = time.perf_counter()
+        total = options["jobs"]
+        for offset in range(0, total, 5000):
+            with transaction.atomic():
+                last_pk = Job.objects.aggregate(last=Max("pk"))["last"] or 0
+                Job.objects.bulk_create([
+                    Job(
+                        customer_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                        phone_number=f"+91 {rng.randrange(70000, 99999)} {rng.randrange(10000, 99999)}",
+                        location=f"{rng.randrange(1, 200)} Main Road, {rng.choice(CITIES)} (bench)",
+                        issue=" ".join(rng.sample(ISSUE_WORDS, 6)),
+                        work_date=today,
+                    )
+                    for _n in range(min(5000, total - offset))
+                ])
+                search.reindex(Job.objects.filter(pk__gt=last_pk))
+        versions.bump("job")
+        elapsed = time.perf_counter() - started
+        postings = SearchTerm.objects.filter(model="job").count()
+        self.stdout.write(f"seeded and indexed {total} jobs in {elapsed:.1f} s ({postings} job postings in the index)")
+
+    def run(self, options, token):
+        client = Client(HTTP_AUTHORIZATION=f"Token {token}")
+        for query in QUERIES:
+            latencies = []
+            for _n in range(options["repeat"]):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get("/api/search/", {"q": query})
+                    latencies.append(time.perf_counter() - started)
+            body = response.json()
+            top = body["results"][0]["score"] if body["results"] else "-"
+            self.stdout.write(
+                f"{query!r:26} status {response.status_code}, {len(body['results'])} on page 1 (top score {top}), "
+                f"{len(queries)} queries, p50 {statistics.median(latencies) * 1000:.1f} ms, "
+                f"p99 {percentile(latencies, 99) * 1000:.1f} ms"
+            )
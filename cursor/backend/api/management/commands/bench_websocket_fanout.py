@@ -0,0 +1,196 @@
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from api import events
+
+IN_MEMORY_LAYER = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "CONFIG": {"capacity": 10000},
+    }
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many concurrent WebSocket connections against backend.asgi with "
+        "an InMemoryChannelLayer, publish a burst of events, and report "
+        "fan-out latency percentiles, frames per client and memory per "
+        "connection. Optionally adds stalled clients, which stop reading and "
+        "answering pings as a client with a full TCP window would, while "
+        "the server keeps accepting its sends, to check that they are "
+        "dropped without holding up the rest. Note that "
+        "InMemoryChannelLayer sweeps every channel for expired messages on each "
+        "receive, so at thousands of sockets its own overhead dominates the "
+        "latencies; compare runs at the same --connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=1000, help="Concurrent sockets (default 1000).")
+        parser.add_argument("--events", type=int, default=100, help="Events to publish (default 100).")
+        parser.add_argument("--interval-ms", type=float, default=1.0, help="Delay between events (default 1 ms).")
+        parser.add_argument("--slow", type=int, default=0, help="Extra clients that stop reading (default 0).")
+        parser.add_argument(
+            "--max-lag-ms", type=int, default=None,
+            help="Override WS_MAX_LAG_MS; stalled clients are dropped by the first event after this long.",
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help="Override WS_BATCH_SIZE.")
+        parser.add_argument("--connect-batch", type=int, default=200, help="Handshakes in flight at once.")
+
+    def handle(self, *args, **options):
+        if options["max_lag_ms"] is None:
+            options["max_lag_ms"] = settings.WS_MAX_LAG_MS
+        if options["batch_size"] is None:
+            options["batch_size"] = settings.WS_BATCH_SIZE
+        # Sockets must authenticate; every one of them logs in as a throwaway employee.
+        user = User.objects.create_user(username="bench-websocket@example.com")
+        token = Token.objects.create(user=user)
+        try:
+            with override_settings(
+                CHANNEL_LAYERS=IN_MEMORY_LAYER, WS_MAX_LAG_MS=options["max_lag_ms"], WS_BATCH_SIZE=options["batch_size"],
+            ):
+                asyncio.run(self.run(options, f"/ws/notifications/?token={token.key}"))
+        finally:
+            user.delete()
+
+    async def run(self, options, path):
+        from backend.asgi import application
+
+        count, slow = options["connections"], options["slow"]
+
+        tracemalloc.start()
+        before, _peak = tracemalloc.get_traced_memory()
+        clients = await self.connect([application] * count, path, options["connect_batch"])
+        after, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"connected {count} sockets, {(after - before) / count / 1024:.1f} KiB traced per connection"
+        )
+
+        # Stalled clients read the welcome frame, then nothing: what is sent to them piles up unread.
+        stalled_clients = await self.connect([application] * slow, path, options["connect_batch"])
+
+        readers = [asyncio.ensure_future(self.read(client, options["events"])) for client in clients]
+        channel_layer = get_channel_layer()
+        started = time.perf_counter()
+        serialize_time = 0.0
+        for i in range(options["events"]):
+            t0 = time.perf_counter()
+            message = events.message("bench.ping", i, {"sent": t0, "padding": "x" * 200})
+            serialize_time += time.perf_counter() - t0
+            await channel_layer.group_send(events.GROUP_NAME, message)
+            if options["interval_ms"]:
+                await asyncio.sleep(options["interval_ms"] / 1000)
+        results = await asyncio.gather(*readers)
+        elapsed = time.perf_counter() - started
+
+        healthy_dropped = sum(dropped for _latencies, _frames, dropped in results)
+        if slow:
+            # Lag is checked when an event arrives: wait it out, then publish one more.
+            # Healthy clients keep answering pings meanwhile.
+            answering = [asyncio.ensure_future(self.answer_pings(client)) for client in clients]
+            await asyncio.sleep(options["max_lag_ms"] / 1000 + 0.1)
+            await channel_layer.group_send(events.GROUP_NAME, events.message("bench.ping", -1, {"sent": 0}))
+            await asyncio.sleep(0.5)
+            for task in answering:
+                task.cancel()
+            healthy_dropped += sum(
+                dropped is True for dropped in await asyncio.gather(*answering, return_exceptions=True)
+            )
+
+        latencies = [latency for client_latencies, _frames, _dropped in results for latency in client_latencies]
+        frames = [frame_count for _latencies, frame_count, _dropped in results]
+        delivered = len(latencies)
+        expected = count * options["events"]
+        self.stdout.write(
+            f"published {options['events']} events in {elapsed:.2f}s "
+            f"(serialize {serialize_time * 1000:.2f} ms total), delivered {delivered}/{expected}"
+        )
+        if latencies:
+            self.stdout.write(
+                "fan-out latency ms: "
+                + "  ".join(
+                    f"p{pct}={percentile(latencies, pct) * 1000:.1f}" for pct in (50, 90, 99)
+                )
+                + f"  max={max(latencies) * 1000:.1f}  mean={statistics.mean(latencies) * 1000:.1f}"
+            )
+            self.stdout.write(f"frames per client: mean {statistics.mean(frames):.1f} for {options['events']} events")
+
+        self.stdout.write(f"healthy clients dropped: {healthy_dropped}/{count}")
+        stalled_dropped = 0
+        if slow:
+            remaining = len(channel_layer.groups.get(events.GROUP_NAME, {}))
+            stalled_dropped = count - healthy_dropped + slow - remaining
+            unread = [client.output_queue.qsize() for client in stalled_clients]
+            self.stdout.write(
+                f"stalled clients dropped: {stalled_dropped}/{slow} "
+                f"(after {options['max_lag_ms']} ms, with {statistics.mean(unread):.0f} frames unread each)"
+            )
+
+        for client in clients + stalled_clients:
+            client.future.cancel()
+        await asyncio.gather(*(client.future for client in clients + stalled_clients), return_exceptions=True)
+
+        ok = delivered == expected and not healthy_dropped and stalled_dropped == slow
+        style = self.style.SUCCESS if ok else self.style.ERROR
+        self.stdout.write(style(f"all events delivered and only stalled clients dropped: {ok}"))
+
+    async def connect(self, applications, path, batch):
+        clients = []
+        for start in range(0, len(applications), batch):
+            chunk = [
+                WebsocketCommunicator(app, path) for app in applications[start:start + batch]
+            ]
+            results = await asyncio.gather(*(client.connect(timeout=30) for client in chunk))
+            for client, (connected, _subprotocol) in zip(chunk, results):
+                if not connected:
+                    raise RuntimeError("WebSocket handshake was rejected")
+                await client.receive_from(timeout=30)  # welcome
+            clients.extend(chunk)
+        return clients
+
+    async def read(self, client, expected):
+        """Read like the frontend does, answering pings; returns (latencies, frames, dropped)."""
+        latencies, frames = [], 0
+        while len(latencies) < expected:
+            try:
+                message = await client.receive_output(timeout=10)
+            except asyncio.TimeoutError:
+                break
+            if message["type"] == "websocket.close":
+                return latencies, frames, True
+            received = time.perf_counter()
+            payload = json.loads(message["text"])
+            if payload["type"] == "ping":
+                await client.send_to(text_data=json.dumps({"type": "pong", "seq": payload["seq"]}))
+                continue
+            frames += 1
+            for event in payload["events"] if payload["type"] == "batch" else [payload]:
+                latencies.append(received - event["data"]["sent"])
+        return latencies, frames, False
+
+    async def answer_pings(self, client):
+        """Keep a client that has read everything responsive; returns True if it was closed."""
+        while True:
+            message = await client.receive_output(timeout=None)
+            if message["type"] == "websocket.close":
+                return True
+            payload = json.loads(message["text"])
+            if payload["type"] == "ping":
+                await client.send_to(text_data=json.dumps({"type": "pong", "seq": payload["seq"]}))
@@ -0,0 +1,49 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import imports
+from api.serializers import DeviceSerializer, JobSerializer
+
+SERIALIZERS = {
+    "devices": DeviceSerializer,
+    "jobs": JobSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import devices or jobs from a CSV file (header row of field names) or "
+        "a JSON array of objects, in batches. Invalid rows are reported and "
+        "skipped; the rest are created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(SERIALIZERS))
+        parser.add_argument("path", help="CSV or JSON file; '-' reads standard input.")
+        parser.add_argument("--format", choices=("csv", "json"), help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per transaction (IMPORT_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or imports.format_of(path, "")
+        if fmt is None:
+            raise CommandError("Cannot tell the format from the file name; pass --format.")
+
+        try:
+            file = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+        importer = imports.Importer(SERIALIZERS[options["kind"]], batch_size=options["batch_size"])
+        try:
+            report = importer.run(imports.parse(iter(lambda: file.read(imports.READ_SIZE), b""), fmt))
+        finally:
+            if file is not sys.stdin.buffer:
+                file.close()
+
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(f"{options['kind']}: created {report['created']}, failed {report['failed']}")
+        if report["failed"]:
+            raise SystemExit(1)
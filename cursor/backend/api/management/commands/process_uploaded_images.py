@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from api import images
+from api.models import ProcessedImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate thumbnail and web variants for uploaded photos that do not "
+        "have them yet: uploads from before the image pipeline existed, and "
+        "any whose background processing failed. Uploads that are not "
+        "decodable images are recorded and skipped; --retry-failed tries "
+        "them again. Also moves the variants of ID proofs stored before they "
+        "were kept private under images/private/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Process at most this many rows per model.")
+        parser.add_argument(
+            "--retry-failed", action="store_true",
+            help="Forget which uploads could not be decoded and try them again.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            # The rows pointing at them go back to unprocessed (SET_NULL).
+            forgotten, _by_model = ProcessedImage.objects.exclude(error="").delete()
+            self.stdout.write(f"Forgot {forgotten} failed upload(s)")
+        for model, (file_field, image_field) in images.PROCESSED_FIELDS.items():
+            pending = (
+                model._default_manager.filter(**{f"{image_field}__isnull": True})
+                .exclude(**{file_field: ""})
+                .exclude(**{f"{file_field}__isnull": True})
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            if options["limit"] is not None:
+                pending = pending[:options["limit"]]
+            done = failed = 0
+            for pk in list(pending):
+                try:
+                    done += images.process(model, pk)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: {exc}")
+            self.stdout.write(f"{model.__name__}: processed {done}, failed {failed}")
+
+        for model in images.PRIVATE_MODELS:
+            _file_field, image_field = images.PROCESSED_FIELDS[model]
+            public = ProcessedImage.objects.filter(
+                pk__in=model._default_manager.values(image_field),
+            ).exclude(web__startswith=images.PRIVATE_PREFIX).exclude(web="")
+            moved = sum(images.make_private(processed) for processed in public)
+            self.stdout.write(f"{model.__name__}: made {moved} image(s) private")
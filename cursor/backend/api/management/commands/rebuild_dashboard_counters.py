@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from api import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard counters from the Job, Rental, Device and User "
+        "tables (one aggregate query per model) and repair any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift; exit with status 1 if any counter is wrong.",
+        )
+
+    def handle(self, *args, **options):
+        drift = counters.check() if options["check"] else counters.rebuild()
+
+        for key, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{key}: stored={stored} actual={actual}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Dashboard counters are in sync."))
+        elif options["check"]:
+            self.stderr.write(self.style.ERROR(f"{len(drift)} counter(s) have drifted."))
+            raise SystemExit(1)
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(drift)} counter(s)."))
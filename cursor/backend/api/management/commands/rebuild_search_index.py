@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the /api/search/ index from the Job, Rental and JobReport "
+        "tables, one transaction per model. Writes keep the index current, "
+        "so this is only needed after changing the indexed fields or weights, "
+        "or after writing rows without going through the ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Rows read and indexed at a time (default 1000).",
+        )
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild(chunk_size=options["chunk_size"])
+        for name, count in indexed.items():
+            self.stdout.write(f"{name}: {count} row(s) indexed")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
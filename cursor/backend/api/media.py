@@ -0,0 +1,397 @@
+"""
+Serving uploaded files from ``MEDIA_ROOT``.
+
+``MediaFilesHandler`` answers ``MEDIA_URL`` requests in ``backend.asgi``
+ahead of Django, so a large ID-proof scan never occupies the thread Django
+runs sync views on. ``serve_media`` is the same logic as a plain view for
+WSGI deployments.
+
+Only the derived, EXIF-free variants under ``images/`` (``api.images``) are
+public, except those under ``images/private/`` (ID proofs). Every other
+upload, such as the ID-proof originals under ``rentals/``, needs a signed
+URL, an ``Authorization: Token <key>`` header or a session, and gets ``401``
+otherwise. ``MediaStorage`` (the default file storage) signs the URLs of
+private files: ``?expires=<unix time>&signature=<HMAC of name and expiry>``,
+made with ``django.core.signing`` and valid for ``MEDIA_URL_MAX_AGE`` to
+twice that many seconds. API responses therefore carry links the browser can
+open itself, without putting the long-lived API token in a URL where access
+logs, proxies and ``Referer`` headers would pick it up. Signatures only
+change once per ``MEDIA_URL_MAX_AGE`` window, and the window is part of every
+API ETag (``api.versions``), so a revalidated response never holds expired
+links. ``MediaFilesHandler`` checks signatures and tokens itself and leaves
+every other private request to ``serve_media``, which also knows about
+sessions. Behind ``MEDIA_SENDFILE`` the check still happens here, before the
+front-end server is told to send the file, so its location must be
+``internal``.
+
+Both support conditional GET (strong ETag from size and mtime), single
+``Range`` requests (``206``/``416``) and ``HEAD``. Content-addressed files
+(``images/``, named after their SHA-256 by ``api.images``) are sent with
+``Cache-Control: public, max-age=31536000, immutable``; private files get
+``private, no-cache`` and are revalidated on every use.
+
+``MEDIA_SENDFILE`` hands the body to the front-end server instead:
+``"x-accel-redirect"`` (nginx, with an ``internal`` location at
+``MEDIA_ACCEL_REDIRECT_PREFIX`` aliased to ``MEDIA_ROOT``) or
+``"x-sendfile"`` (Apache mod_xsendfile, lighttpd). Otherwise the ASGI
+handler uses the server's zero-copy ``http.response.zerocopysend``
+extension when offered, and ``os.pread`` chunks on the event loop's
+executor when not; under WSGI, ``FileResponse`` lets the server use
+``wsgi.file_wrapper`` (``os.sendfile`` in gunicorn).
+
+``MediaFilesHandler`` records what it serves in ``api.metrics`` under the
+route ``media``, since those requests never reach the Django middleware.
+"""
+
+import asyncio
+import mimetypes
+import os
+import posixpath
+import re
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_http_date_safe, urlencode
+
+from . import metrics
+from .authentication import get_user
+
+CHUNK_SIZE = 256 * 1024
+IMMUTABLE_PREFIXES = ("images/",)
+# Served without credentials: variants only, never originals...
+PUBLIC_PREFIXES = ("images/",)
+# ...and never the variants of identity documents.
+PRIVATE_PREFIXES = ("images/private/",)
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+SIGNING_SALT = "api.media.signed-url"
+
+
+@dataclass
+class MediaFile:
+    name: str
+    path: str
+    size: int
+    mtime: int
+    etag: str
+    content_type: str
+    encoding: str
+
+    @property
+    def immutable(self):
+        return self.name.startswith(IMMUTABLE_PREFIXES) and is_public(self.name)
+
+
+def is_public(name):
+    """Whether ``name`` may be served without credentials."""
+    # "images/../rentals/id.jpg" is an original, whatever it starts with.
+    name = posixpath.normpath(name)
+    return name.startswith(PUBLIC_PREFIXES) and not (name + "/").startswith(PRIVATE_PREFIXES)
+
+
+def _url_max_age():
+    return max(1, int(getattr(settings, "MEDIA_URL_MAX_AGE", 3600)))
+
+
+def signing_window():
+    """Index of the current signing window; signed URLs change only when it does."""
+    return int(time.time()) // _url_max_age()
+
+
+def _signature(name, expires):
+    return signing.Signer(salt=SIGNING_SALT).signature(f"{name}:{expires}")
+
+
+def sign(name):
+    """Query string granting access to private ``name`` until the end of the next window."""
+    expires = (signing_window() + 2) * _url_max_age()
+    return urlencode({"expires": expires, "signature": _signature(name, expires)})
+
+
+def signature_valid(name, expires, signature):
+    """Whether ``expires``/``signature`` (query parameters, maybe None) grant ``name`` now."""
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    return expires >= time.time() and constant_time_compare(signature or "", _signature(name, expires))
+
+
+class MediaStorage(FileSystemStorage):
+    """``FileSystemStorage`` whose URLs for private files are signed (see ``sign``)."""
+
+    def url(self, name):
+        url = super().url(name)
+        if name and not is_public(name):
+            url = f"{url}?{sign(name)}"
+        return url
+
+
+def _token(authorization):
+    keyword, _, key = authorization.partition(" ")
+    return key.strip() if keyword.lower() == "token" else ""
+
+
+def _authenticated(request, path):
+    if signature_valid(path, request.GET.get("expires"), request.GET.get("signature")):
+        return True
+    if request.user.is_authenticated:
+        return True
+    key = _token(request.headers.get("Authorization", ""))
+    return bool(key) and get_user(key) is not None
+
+
+def resolve(name):
+    """Return the ``MediaFile`` for a path under ``MEDIA_ROOT``, or None."""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+        stat = os.stat(path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        return None
+    if not os.path.isfile(path):
+        return None
+    content_type, encoding = mimetypes.guess_type(path)
+    return MediaFile(
+        name=name,
+        path=path,
+        size=stat.st_size,
+        mtime=int(stat.st_mtime),
+        etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        content_type=content_type or "application/octet-stream",
+        encoding=encoding,
+    )
+
+
+def _byte_range(header, size):
+    """
+    Parse a single-range ``Range`` header. Returns ``(start, end)`` inclusive,
+    ``None`` to serve the whole file, or ``False`` when unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:  # absent, malformed or multi-range: send everything
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _etag_matches(header, etag):
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def plan(method, headers, media):
+    """
+    Decide the response for a GET/HEAD of ``media``.
+
+    ``headers`` maps lower-case request header names to values. Returns
+    ``(status, response headers, (offset, length) or None)``, where the
+    last item is the slice of the file to send in the body.
+    """
+    response_headers = {
+        "ETag": media.etag,
+        "Last-Modified": http_date(media.mtime),
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+        "Cache-Control": (
+            "public, max-age=31536000, immutable" if media.immutable else "private, no-cache"
+        ),
+    }
+
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, media.etag)
+    else:
+        since = parse_http_date_safe(headers.get("if-modified-since", ""))
+        not_modified = since is not None and media.mtime <= since
+    if not_modified:
+        return 304, response_headers, None
+
+    response_headers["Content-Type"] = media.content_type
+    if media.encoding:
+        response_headers["Content-Encoding"] = media.encoding
+
+    byte_range = None
+    if_range = headers.get("if-range")
+    if if_range is None or if_range.strip() == media.etag:
+        byte_range = _byte_range(headers.get("range"), media.size)
+    if byte_range is False:
+        response_headers["Content-Range"] = f"bytes */{media.size}"
+        response_headers["Content-Length"] = "0"
+        return 416, response_headers, None
+    if byte_range is None:
+        status, (offset, length) = 200, (0, media.size)
+    else:
+        start, end = byte_range
+        status, (offset, length) = 206, (start, end - start + 1)
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{media.size}"
+    response_headers["Content-Length"] = str(length)
+
+    if method == "HEAD":
+        return status, response_headers, None
+    return status, response_headers, (offset, length)
+
+
+def offload_headers(media):
+    """Headers handing the body to the front-end server, or None to send it ourselves."""
+    mode = getattr(settings, "MEDIA_SENDFILE", "")
+    if mode == "x-accel-redirect":
+        prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+        return {"X-Accel-Redirect": prefix.rstrip("/") + "/" + media.name}
+    if mode == "x-sendfile":
+        return {"X-Sendfile": media.path}
+    return None
+
+
+class MediaFilesHandler:
+    """ASGI wrapper serving ``MEDIA_URL`` itself and passing everything else on."""
+
+    def __init__(self, application):
+        self.application = application
+        self.prefix = "/" + settings.MEDIA_URL.lstrip("/")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            return await self.application(scope, receive, send)
+        name = scope["path"][len(self.prefix):]
+        if not is_public(name):
+            query = parse_qs(scope.get("query_string", b"").decode("latin1"))
+            expires, signature = (query.get(param, [None])[0] for param in ("expires", "signature"))
+            if not signature_valid(name, expires, signature):
+                headers = dict(scope["headers"])
+                key = _token(headers.get(b"authorization", b"").decode("latin1"))
+                if not key or await database_sync_to_async(get_user)(key) is None:
+                    # No valid signature or token: serve_media checks the session or answers 401.
+                    return await self.application(scope, receive, send)
+
+        started = time.perf_counter()
+        response = {"status": 500, "size": 0}
+
+        async def measured_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            elif message["type"] == "http.response.zerocopysend":
+                response["size"] += message["count"]
+            await send(message)
+
+        try:
+            await self._serve(scope, measured_send)
+        finally:
+            metrics.record_request(
+                "media", scope["method"], response["status"], time.perf_counter() - started, response["size"],
+            )
+
+    async def _serve(self, scope, send):
+        if scope["method"] not in ("GET", "HEAD"):
+            return await self._respond(send, 405, {"Allow": "GET, HEAD", "Content-Length": "0"})
+        media = resolve(scope["path"][len(self.prefix):])
+        if media is None:
+            return await self._respond(send, 404, {"Content-Type": "text/plain", "Content-Length": "9"}, b"Not Found")
+
+        headers = {name.decode("latin1"): value.decode("latin1") for name, value in scope["headers"]}
+        status, response_headers, body = plan(scope["method"], headers, media)
+        offload = offload_headers(media) if status in (200, 206) else None
+        if offload is not None:
+            # The front-end server applies Range and sets the length itself.
+            for name in ("Content-Length", "Content-Range", "Accept-Ranges"):
+                response_headers.pop(name, None)
+            response_headers.update(offload)
+            status = 200
+            body = None
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode("latin1"), value.encode("latin1")) for name, value in response_headers.items()],
+        })
+        if body is None:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        offset, length = body
+        with open(media.path, "rb") as file:
+            if length and "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": offset, "count": length})
+                return
+            loop = asyncio.get_running_loop()
+            fd = file.fileno()
+            finished = False
+            while length > 0:
+                chunk = await loop.run_in_executor(None, os.pread, fd, min(CHUNK_SIZE, length), offset)
+                if not chunk:  # truncated since we looked
+                    break
+                offset += len(chunk)
+                length -= len(chunk)
+                finished = length == 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": not finished})
+            if not finished:
+                # An empty file or range, or a truncated one: the response still needs its last message.
+                await send({"type": "http.response.body", "body": b""})
+
+    async def _respond(self, send, status, headers, body=b""):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode("latin1"), value.encode("latin1")) for name, value in headers.items()],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _read_range(path, offset, length):
+    with open(path, "rb") as file:
+        file.seek(offset)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    """``MEDIA_URL`` view for WSGI deployments; see ``MediaFilesHandler``."""
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    if not is_public(path) and not _authenticated(request, path):
+        response = HttpResponse("Authentication required", status=401, content_type="text/plain")
+        response["WWW-Authenticate"] = "Token"
+        return response
+    media = resolve(path)
+    if media is None:
+        raise Http404("Not Found")
+
+    headers = {name.lower(): value for name, value in request.headers.items()}
+    status, response_headers, body = plan(request.method, headers, media)
+    offload = offload_headers(media) if status in (200, 206) else None
+    if offload is not None:
+        response = HttpResponse(status=200)
+        for name in ("Content-Length", "Content-Range", "Accept-Ranges"):
+            response_headers.pop(name, None)
+        response_headers.update(offload)
+    elif body is None:
+        response = HttpResponse(status=status)
+    elif status == 200:
+        response = FileResponse(open(media.path, "rb"), status=200)
+    else:
+        response = StreamingHttpResponse(_read_range(media.path, *body), status=status)
+    for name, value in response_headers.items():
+        response[name] = value
+    return response
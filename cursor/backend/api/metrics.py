@@ -0,0 +1,249 @@
+"""
+Request and WebSocket metrics in the Prometheus text format.
+
+``MetricsMiddleware`` (first in ``settings.MIDDLEWARE``) times every Django
+request. It counts the request's database queries and their time through
+``connection.execute_wrapper`` and records the response size, all under the
+route name: the URL pattern's view name, which for router viewsets is the
+DRF route name (``job-list``, ``rental-return``, ``device-available``...).
+Requests that match no route are recorded as ``unmatched``. In
+``backend.asgi``, ``MediaFilesHandler`` records the media files it serves
+ahead of Django as ``media``, timed to the last byte sent. ``WebSocketMetricsMiddleware`` (in
+``api.middleware``) tracks open and total sockets and frames sent.
+
+Latency is measured up to the response headers, so a streamed export
+counts its first chunk only, and its size is not recorded.
+
+With ``METRICS_SLOW_REQUEST_MS`` set, the SQL of each request is kept
+while it runs (statements only, never parameters, at most
+``SLOW_REQUEST_STATEMENTS``). A request slower than the threshold is
+logged at WARNING as a ``request.slow`` event, and the last
+``METRICS_SLOW_SAMPLES`` of them are kept in full, with every statement
+and its time.
+
+``GET /api/metrics/`` renders everything for admins, or for a scraper
+sending ``Authorization: Bearer <METRICS_TOKEN>``. ``GET
+/api/metrics/slow/`` lists the kept slow requests as JSON. The values are
+per process: with several worker processes, scrape each of them.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_STATEMENTS = 50
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SOCKET_DURATION_BUCKETS = (1, 10, 60, 300, 900, 3600, 14400)
+
+_lock = threading.Lock()
+_metrics = []
+slow_requests = deque(maxlen=getattr(settings, "METRICS_SLOW_SAMPLES", 50))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+        _metrics.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.series.items()):
+            lines.extend(self._lines(labels, value))
+        return lines
+
+    def _lines(self, labels, value):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with _lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with _lock:
+            series = self.series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf) and the running sum.
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def _lines(self, labels, value):
+        counts, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), counts):
+            cumulative += count
+            le = bound if bound == "+Inf" else _number(bound)
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"),
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "Time to the response headers (media files: to the last byte).", ("route", "method"),
+)
+http_db_queries = Histogram(
+    "http_request_db_queries", "Database queries per request.", ("route",), QUERY_COUNT_BUCKETS,
+)
+http_db_time = Histogram(
+    "http_request_db_duration_seconds", "Database time per request.", ("route",),
+)
+http_response_size = Histogram(
+    "http_response_size_bytes", "Response body size (streamed responses excluded).", ("route",), SIZE_BUCKETS,
+)
+http_slow_requests = Counter(
+    "http_slow_requests_total", "Requests slower than METRICS_SLOW_REQUEST_MS.", ("route",),
+)
+websocket_active = Gauge(
+    "websocket_connections_active", "Open WebSocket connections.", ("path",),
+)
+websocket_connections = Counter(
+    "websocket_connections_total", "Accepted WebSocket connections.", ("path",),
+)
+websocket_frames = Counter(
+    "websocket_frames_sent_total", "Frames sent to WebSocket clients.", ("path",),
+)
+websocket_duration = Histogram(
+    "websocket_connection_duration_seconds", "How long accepted sockets stayed open.", ("path",),
+    SOCKET_DURATION_BUCKETS,
+)
+
+
+def render():
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        lines = [line for metric in _metrics for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def record_request(route, method, status, seconds, size=None, queries=0, query_seconds=0.0):
+    http_requests.inc(route, method, str(status))
+    http_latency.observe(seconds, route, method)
+    http_db_queries.observe(queries, route)
+    http_db_time.observe(query_seconds, route)
+    if size is not None:
+        http_response_size.observe(size, route)
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    # Unnamed patterns fall back to the pattern itself, which is just as bounded.
+    return match.view_name or match.route
+
+
+class QueryTimer:
+    """``execute_wrapper`` counting queries and their time, and optionally keeping the SQL."""
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if keep_statements else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if self.statements is not None and len(self.statements) < SLOW_REQUEST_STATEMENTS:
+                self.statements.append((sql, elapsed))
+
+
+class MetricsMiddleware:
+    """Record latency, queries and response size of each request under its route name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_seconds = getattr(settings, "METRICS_SLOW_REQUEST_MS", 0) / 1000
+
+    def __call__(self, request):
+        timer = QueryTimer(keep_statements=bool(self.slow_seconds))
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        route = route_of(request)
+        size = None if response.streaming else len(response.content)
+        record_request(route, request.method, response.status_code, elapsed, size, timer.count, timer.seconds)
+        if self.slow_seconds and elapsed >= self.slow_seconds:
+            self.record_slow(request, response, route, elapsed, timer)
+        return response
+
+    def record_slow(self, request, response, route, elapsed, timer):
+        http_slow_requests.inc(route)
+        sample = {
+            "time": time.time(),
+            "route": route,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "ms": round(elapsed * 1000, 1),
+            "db_queries": timer.count,
+            "db_ms": round(timer.seconds * 1000, 1),
+            "queries": [{"sql": sql, "ms": round(seconds * 1000, 2)} for sql, seconds in timer.statements],
+        }
+        slow_requests.append(sample)
+        logger.warning(
+            "Slow request %s %s took %.0f ms", request.method, route, sample["ms"],
+            extra={
+                "event": "request.slow",
+                **{key: sample[key] for key in ("path", "status", "db_queries", "db_ms", "queries")},
+            },
+        )
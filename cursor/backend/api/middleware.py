@@ -0,0 +1,82 @@
+"""
+ASGI middleware.
+
+``TokenAuthMiddleware`` authenticates WebSocket handshakes with the same DRF
+tokens the SPA uses for REST calls. Browsers cannot set headers on a
+WebSocket, so the token is read from the ``token`` query parameter
+(``ws://host/ws/notifications/?token=<key>``); other clients may send an
+``Authorization: Token <key>`` header instead. Without a token the user set
+by the session ``AuthMiddlewareStack`` is kept. Tokens are looked up through
+the same cache as REST requests (``api.authentication``).
+
+``WebSocketMetricsMiddleware`` feeds the WebSocket metrics of
+``api.metrics``: open and accepted sockets, frames sent and how long each
+socket stayed open.
+"""
+
+import time
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+
+from . import metrics
+from .authentication import get_user
+
+
+@database_sync_to_async
+def get_token_user(key):
+    user = get_user(key)
+    return AnonymousUser() if user is None else user
+
+
+def token_from_scope(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            keyword, _, key = value.decode("latin1").partition(" ")
+            if keyword.lower() == "token" and key:
+                return key.strip()
+    keys = parse_qs(scope.get("query_string", b"").decode("latin1")).get("token")
+    return keys[0] if keys else None
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """Set ``scope["user"]`` from a DRF token on the handshake, if one is given."""
+
+    async def __call__(self, scope, receive, send):
+        key = token_from_scope(scope)
+        if key:
+            scope = dict(scope, user=await get_token_user(key))
+        return await super().__call__(scope, receive, send)
+
+
+class WebSocketMetricsMiddleware:
+    """Count accepted sockets and the frames sent to them, by path."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "websocket":
+            return await self.application(scope, receive, send)
+
+        path = scope["path"]
+        accepted_at = None
+
+        async def counting_send(message):
+            nonlocal accepted_at
+            if message["type"] == "websocket.send":
+                metrics.websocket_frames.inc(path)
+            elif message["type"] == "websocket.accept" and accepted_at is None:
+                accepted_at = time.monotonic()
+                metrics.websocket_connections.inc(path)
+                metrics.websocket_active.inc(path)
+            await send(message)
+
+        try:
+            return await self.application(scope, receive, counting_send)
+        finally:
+            if accepted_at is not None:
+                metrics.websocket_active.dec(path)
+                metrics.websocket_duration.observe(time.monotonic() - accepted_at, path)
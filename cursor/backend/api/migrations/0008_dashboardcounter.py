@@ -0,0 +1,51 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:17
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def seed_counters(apps, schema_editor):
+    """Fill the counter table from the existing rows so increments start from the truth."""
+    DashboardCounter = apps.get_model('api', 'DashboardCounter')
+    values = {}
+    for prefix, model_name, field, choices in [
+        ('job', 'Job', 'status', ['open', 'in_progress', 'completed']),
+        ('rental', 'Rental', 'status', ['active', 'returned']),
+        ('device', 'Device', 'availability', ['available', 'rented', 'maintenance']),
+    ]:
+        totals = apps.get_model('api', model_name).objects.aggregate(
+            total=Count('pk'),
+            **{value: Count('pk', filter=Q(**{field: value})) for value in choices},
+        )
+        values.update({f'{prefix}.{name}': count for name, count in totals.items()})
+
+    users = apps.get_model(settings.AUTH_USER_MODEL).objects.aggregate(
+        total=Count('pk', filter=Q(is_active=True)),
+        admin=Count('pk', filter=Q(is_active=True, is_staff=True)),
+        employee=Count('pk', filter=Q(is_active=True, is_staff=False)),
+    )
+    values.update({f'user.{name}': count for name, count in users.items()})
+
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(key=key, value=value) for key, value in values.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def link_rentals_to_devices(apps, schema_editor):
+    """Point every existing rental at the device whose serial it recorded (one UPDATE)."""
+    Rental = apps.get_model('api', 'Rental')
+    Device = apps.get_model('api', 'Device')
+    Rental.objects.filter(device__isnull=True).update(
+        device=Subquery(
+            Device.objects.filter(serial_no=OuterRef('device_serial')).values('pk')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='device',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rentals', to='api.device'),
+        ),
+        migrations.AlterField(
+            model_name='rental',
+            name='device_serial',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.RunPython(link_rentals_to_devices, migrations.RunPython.noop),
+    ]
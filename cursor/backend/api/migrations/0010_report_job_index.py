@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_rental_device'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobreport',
+            index=models.Index(fields=['job', '-created_at'], name='report_job_created_idx'),
+        ),
+    ]
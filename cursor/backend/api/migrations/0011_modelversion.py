@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:25
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_stamps(apps, schema_editor):
+    ModelVersion = apps.get_model('api', 'ModelVersion')
+    now = timezone.now()
+    ModelVersion.objects.bulk_create(
+        [
+            ModelVersion(name=name, version=1, updated_at=now)
+            for name in ('job', 'rental', 'device', 'jobreport', 'user')
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_report_job_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(create_stamps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_processed_images'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['device', 'status', 'from_date', 'to_date'], name='rental_device_busy_idx'),
+        ),
+    ]
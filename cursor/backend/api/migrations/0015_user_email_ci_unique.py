@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+INDEX_NAME = 'auth_user_email_ci_uniq'
+
+
+def create_email_index(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='')
+        .values(email_key=Lower('email'))
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('email_key', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'These emails are used by more than one account (ignoring case); '
+            f'resolve them before migrating: {", ".join(duplicates)}'
+        )
+    # Blank emails map to NULL, which unique indexes allow any number of.
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX {INDEX_NAME} ON auth_user ((NULLIF(LOWER(email), '')))"
+    )
+
+
+def drop_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(f'DROP INDEX {INDEX_NAME} ON auth_user')
+    else:
+        schema_editor.execute(f'DROP INDEX {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_rental_device_busy_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
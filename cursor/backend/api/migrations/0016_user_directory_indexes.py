@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# name -> indexed columns or expressions
+INDEXES = {
+    # Directory pages, newest first: walked backwards, skipping the (few)
+    # inactive accounts; the second serves ``is_staff = ...`` as a seek.
+    'auth_user_directory_idx': 'date_joined, id',
+    'auth_user_role_directory_idx': 'is_staff, date_joined, id',
+    # Case-insensitive username prefix search
+    'auth_user_username_lower_idx': '(LOWER(username))',
+}
+
+
+def create_indexes(apps, schema_editor):
+    for name, columns in INDEXES.items():
+        schema_editor.execute(f'CREATE INDEX {name} ON auth_user ({columns})')
+
+
+def drop_indexes(apps, schema_editor):
+    for name in INDEXES:
+        if schema_editor.connection.vendor == 'mysql':
+            schema_editor.execute(f'DROP INDEX {name} ON auth_user')
+        else:
+            schema_editor.execute(f'DROP INDEX {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_user_email_ci_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:58
+
+import re
+import unicodedata
+from collections import Counter
+from itertools import islice
+
+from django.db import migrations, models
+
+# A frozen copy of api.search as of this migration, so that later changes to
+# the tokenizer or weights do not change what this migration does. Run
+# ``manage.py rebuild_search_index`` to re-index with the current rules.
+MAX_TERM_LENGTH = 64
+MAX_REPEATS = 3
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the to was were with".split()
+)
+INDEXED_FIELDS = {
+    'Job': ('job', {'customer_name': 4, 'phone_number': 4, 'location': 2, 'issue': 1}),
+    'Rental': ('rental', {'customer_name': 4, 'phone_number': 4, 'device_serial': 4}),
+    'JobReport': ('report', {'company_name': 3, 'equipment_used': 1, 'work_description': 1}),
+}
+PHONE_FIELDS = {'phone_number'}
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+
+
+def tokenize(text):
+    folded = unicodedata.normalize("NFKD", text or "").casefold()
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return [word[:MAX_TERM_LENGTH] for word in _WORD.findall(folded) if word not in STOP_WORDS]
+
+
+def row_postings(fields, row):
+    weights = Counter()
+    for field, weight in fields.items():
+        text = getattr(row, field) or ""
+        terms = tokenize(text)
+        if field in PHONE_FIELDS:
+            groups = _DIGITS.findall(text)
+            for start in range(min(len(groups) - 1, 2)):
+                terms.append("".join(groups[start:])[:MAX_TERM_LENGTH])
+        for term, repeats in Counter(terms).items():
+            weights[term] += weight * min(repeats, MAX_REPEATS)
+    return weights
+
+
+def index_existing(apps, schema_editor):
+    """Index the rows that already exist; from here on every write keeps the index current."""
+    SearchTerm = apps.get_model('api', 'SearchTerm')
+    for model_name, (name, fields) in INDEXED_FIELDS.items():
+        rows = apps.get_model('api', model_name).objects.values_list('id', *fields, named=True)
+        postings = (
+            SearchTerm(model=name, object_id=row.id, term=term, weight=weight)
+            for row in rows.iterator(chunk_size=2000)
+            for term, weight in row_postings(fields, row).items()
+        )
+        while batch := list(islice(postings, 1000)):
+            SearchTerm.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'model', 'object_id', 'weight'], name='search_term_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id', 'term'), name='search_posting_uniq'),
+        ),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
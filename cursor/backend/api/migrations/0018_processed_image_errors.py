@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processedimage',
+            name='error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='processedimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='processedimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='images/'),
+        ),
+        migrations.AlterField(
+            model_name='processedimage',
+            name='web',
+            field=models.ImageField(blank=True, upload_to='images/'),
+        ),
+        migrations.AlterField(
+            model_name='processedimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
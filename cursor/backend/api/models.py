@@ -1,7 +1,28 @@
-from django.db import models
+from django.db import models, transaction
 
 
-class Job(models.Model):
+class TrackedModel(models.Model):
+    """
+    Base for models whose writes also maintain derived state (dashboard
+    counters, ...) through signal handlers.
+
+    save() and delete() run inside a transaction so that state commits or
+    rolls back together with the row itself.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            return super().delete(*args, **kwargs)
+
+
+class Job(TrackedModel):
     """Service job posted by admin and handled by employees."""
 
     PRIORITY_CHOICES = [
@@ -26,12 +47,22 @@ class Job(models.Model):
     assigned_to = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_jobs')
     assigned_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="job_status_created_idx"),
+            models.Index(fields=["assigned_to", "status"], name="job_assignee_status_idx"),
+            models.Index(fields=["work_date"], name="job_work_date_idx"),
+            models.Index(fields=["-created_at", "-id"], name="job_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="job_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Job #{self.pk} - {self.customer_name}"
 
 
-class Rental(models.Model):
+class Rental(TrackedModel):
     """Rental record for devices."""
 
     STATUS_CHOICES = [
@@ -41,17 +72,32 @@ class Rental(models.Model):
 
     customer_name = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=50)
-    device_serial = models.CharField(max_length=100)
+    device_serial = models.CharField(max_length=100, db_index=True)
+    device = models.ForeignKey(
+        'Device', on_delete=models.SET_NULL, null=True, blank=True, related_name='rentals'
+    )
     from_date = models.DateField()
     to_date = models.DateField()
     rental_days = models.PositiveIntegerField()
     security_deposit = models.DecimalField(max_digits=10, decimal_places=2)
     id_proof = models.ImageField(upload_to='rentals/', blank=True)
+    id_proof_image = models.ForeignKey(
+        'ProcessedImage', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="active")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="rental_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="rental_updated_idx"),
+            # Overlap probes for the reservation calendar (api.availability)
+            models.Index(fields=["device", "status", "from_date", "to_date"], name="rental_device_busy_idx"),
+        ]
 
-class Device(models.Model):
+
+class Device(TrackedModel):
     """Device inventory."""
 
     AVAILABILITY_CHOICES = [
@@ -67,12 +113,19 @@ class Device(models.Model):
         max_length=20, choices=AVAILABILITY_CHOICES, default="available"
     )
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "id"], name="device_model_idx"),
+            models.Index(fields=["updated_at", "id"], name="device_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.device_name} ({self.serial_no})"
 
 
-class JobReport(models.Model):
+class JobReport(TrackedModel):
     """Completion report submitted by staff members."""
 
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="reports")
@@ -81,6 +134,120 @@ class JobReport(models.Model):
     equipment_used = models.TextField()
     work_description = models.TextField()
     completion_photo = models.ImageField(upload_to='job_reports/', blank=True, null=True)
+    completion_photo_image = models.ForeignKey(
+        'ProcessedImage', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="report_created_idx"),
+            models.Index(fields=["job", "-created_at"], name="report_job_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="report_updated_idx"),
+        ]
+
+
+
+
+class DashboardCounter(models.Model):
+    """
+    Running per-status totals behind the admin dashboard, e.g. ``job.open``.
+
+    Maintained by ``api.counters`` on every Job/Rental/Device/User write and
+    rebuilt from scratch by ``manage.py rebuild_dashboard_counters``.
+    """
 
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
 
+    def __str__(self) -> str:
+        return f"{self.key} = {self.value}"
+
+
+class ModelVersion(models.Model):
+    """
+    Version stamp per model (``job``, ``rental``, ...), bumped by
+    ``api.versions`` on every write so list and detail responses can be
+    revalidated with an ETag instead of being rebuilt.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.name} v{self.version}"
+
+
+class DeletedRecord(models.Model):
+    """
+    Tombstone for a deleted Job/Rental/Device/JobReport row, so delta sync
+    clients (``?since=``) learn about deletions. Pruned after
+    ``SYNC_TOMBSTONE_DAYS`` by ``manage.py prune_deleted_records``.
+    """
+
+    model = models.CharField(max_length=64)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "deleted_at"], name="deleted_model_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at}"
+
+
+class ProcessedImage(models.Model):
+    """
+    Thumbnail and web-sized variants of an uploaded photo, generated by
+    ``api.images`` after the upload commits. Keyed by the SHA-256 of the
+    original, so identical uploads share one original file and one set of
+    variants, whose file names are derived from that hash. An upload that
+    is not a decodable image gets a row with ``error`` set and no variants,
+    so it is not retried on every run.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    original = models.CharField(max_length=255)
+    # Blank, with no size, when the upload could not be decoded (see ``error``).
+    thumbnail = models.ImageField(upload_to='images/', blank=True)
+    web = models.ImageField(upload_to='images/', blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"{self.sha256[:12]} (failed: {self.error})"
+        return f"{self.sha256[:12]} ({self.width}x{self.height})"
+
+
+class SearchTerm(models.Model):
+    """
+    One posting of the ``/api/search/`` inverted index: ``term`` occurs in
+    row ``object_id`` of ``model`` (``job``, ``rental`` or ``report``) with
+    the given field-weighted ``weight``. Maintained by ``api.search`` on
+    every write and rebuilt by ``manage.py rebuild_search_index``.
+    """
+
+    model = models.CharField(max_length=16)
+    object_id = models.BigIntegerField()
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also serves "every posting of this row" on reindex and delete.
+            models.UniqueConstraint(fields=["model", "object_id", "term"], name="search_posting_uniq"),
+        ]
+        indexes = [
+            # Term lookups and prefix ranges read only the index.
+            models.Index(fields=["term", "model", "object_id", "weight"], name="search_term_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.term} -> {self.model} #{self.object_id} ({self.weight})"
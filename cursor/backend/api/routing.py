@@ -3,7 +3,7 @@ from django.urls import re_path
 from .consumers import NotificationConsumer
 
 websocket_urlpatterns = [
-    # Frontend WebSocket URL: ws://<host>/ws/notifications/
+    # Frontend WebSocket URL: ws://<host>/ws/notifications/?token=<auth token>
     re_path(r"^ws/notifications/$", NotificationConsumer.as_asgi()),
 ]
 
@@ -0,0 +1,231 @@
+"""
+Full-text search over jobs, rentals and job reports.
+
+``SearchTerm`` is an inverted index stored in an ordinary table: one
+posting per (row, term), weighted so that a name, phone number or serial
+outranks a word in a free-text description. Text is tokenized here in
+Python (Unicode words, case- and accent-folded), so the same index works on
+MySQL and on the SQLite development database, without any vendor FULLTEXT
+support.
+
+Signal handlers re-index a row inside its write's transaction (see
+``TrackedModel``), rewriting only the postings that changed, and drop its
+postings when it is deleted. ``bulk_create()`` skips signals, so code that
+inserts indexed rows that way must call ``reindex()`` itself.
+``manage.py rebuild_search_index`` rebuilds the whole index.
+
+A query matches the rows that contain every query term. The last term also
+matches as a prefix, so results follow the user's typing. Rows are ranked by
+the summed weight of their matching postings. Each term is an index range
+read on ``search_term_idx``, so the cost of a query grows with the number of
+postings its terms have, not with the number of rows indexed.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Max, Q, Sum, Value, When
+from django.db.models.signals import post_delete, post_save
+
+from .models import Job, JobReport, Rental, SearchTerm
+from .row_serializers import RowSerializer
+from .serializers import JobReportSerializer, JobSerializer, RentalSerializer
+
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+# Shorter prefixes would read a large slice of the index; they only match whole words.
+MIN_PREFIX_LENGTH = 2
+# Repeating a word in one field stops raising its weight after this many times.
+MAX_REPEATS = 3
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the to was were with".split()
+)
+
+# model -> (type name, serializer of the returned rows, {field: weight})
+INDEXED_MODELS = {
+    Job: ("job", JobSerializer, {"customer_name": 4, "phone_number": 4, "location": 2, "issue": 1}),
+    Rental: ("rental", RentalSerializer, {"customer_name": 4, "phone_number": 4, "device_serial": 4}),
+    JobReport: ("report", JobReportSerializer, {"company_name": 3, "equipment_used": 1, "work_description": 1}),
+}
+
+MODEL_TYPES = {name: model for model, (name, *_rest) in INDEXED_MODELS.items()}
+
+# Their digits are also indexed run together, so "+91 98765 43210" is found
+# by "98765", "9876543210" and "919876543210".
+PHONE_FIELDS = {"phone_number"}
+
+_row_serializers = {
+    model: RowSerializer(serializer_class)
+    for model, (_name, serializer_class, _fields) in INDEXED_MODELS.items()
+}
+
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+
+
+def tokenize(text):
+    """The case- and accent-folded words of ``text``, without stop words."""
+    folded = unicodedata.normalize("NFKD", text or "").casefold()
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return [word[:MAX_TERM_LENGTH] for word in _WORD.findall(folded) if word not in STOP_WORDS]
+
+
+def postings(model, row):
+    """``{term: weight}`` for one row, a model instance or a named ``values_list()`` row."""
+    weights = Counter()
+    for field, weight in INDEXED_MODELS[model][2].items():
+        text = getattr(row, field) or ""
+        terms = tokenize(text)
+        if field in PHONE_FIELDS:
+            groups = _DIGITS.findall(text)
+            # All groups run together, and again without the first (e.g. "+91").
+            for start in range(min(len(groups) - 1, 2)):
+                terms.append("".join(groups[start:])[:MAX_TERM_LENGTH])
+        for term, repeats in Counter(terms).items():
+            weights[term] += weight * min(repeats, MAX_REPEATS)
+    return weights
+
+
+def index(model, row):
+    """Bring the postings of one row up to date, writing only the ones that changed."""
+    name = INDEXED_MODELS[model][0]
+    wanted = postings(model, row)
+    current = dict(SearchTerm.objects.filter(model=name, object_id=row.id).values_list("term", "weight"))
+    stale = [term for term, weight in current.items() if wanted.get(term) != weight]
+    if stale:
+        SearchTerm.objects.filter(model=name, object_id=row.id, term__in=stale).delete()
+    SearchTerm.objects.bulk_create(
+        [
+            SearchTerm(model=name, object_id=row.id, term=term, weight=weight)
+            for term, weight in wanted.items()
+            if current.get(term) != weight
+        ],
+        # A case-insensitive MySQL collation can treat two folded terms as equal.
+        ignore_conflicts=True,
+    )
+
+
+def reindex(queryset):
+    """Rewrite the postings of every row in ``queryset``, e.g. after ``bulk_create()``."""
+    model = queryset.model
+    name, _serializer, fields = INDEXED_MODELS[model]
+    rows = list(queryset.values_list("id", *fields, named=True))
+    if not rows:
+        return 0
+    SearchTerm.objects.filter(model=name, object_id__in=[row.id for row in rows]).delete()
+    SearchTerm.objects.bulk_create(
+        [
+            SearchTerm(model=name, object_id=row.id, term=term, weight=weight)
+            for row in rows
+            for term, weight in postings(model, row).items()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(rows)
+
+
+def rebuild(chunk_size=1000):
+    """Re-index every row from scratch, one transaction per model; returns ``{type: rows}``."""
+    indexed = {}
+    for model, (name, *_rest) in INDEXED_MODELS.items():
+        with transaction.atomic():
+            SearchTerm.objects.filter(model=name).delete()
+            total, last_id = 0, 0
+            while True:
+                ids = list(
+                    model._default_manager.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+                total += reindex(model._default_manager.filter(id__in=ids))
+                last_id = ids[-1]
+        indexed[name] = total
+    return indexed
+
+
+def terms_of(query):
+    """The distinct search terms of a query string, at most ``MAX_QUERY_TERMS``."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def matches(query, types=None):
+    """
+    The rows matching ``query`` as named ``(model, object_id, score)`` rows,
+    unordered; ``types`` optionally limits them to some type names.
+    """
+    terms = terms_of(query)
+    if not terms:
+        return SearchTerm.objects.none().values_list("model", "object_id", named=True).annotate(score=Sum("weight"))
+
+    *words, last = terms
+    word_match = Q(term__in=words)
+    if len(last) >= MIN_PREFIX_LENGTH:
+        # "last <= term < last + 1": a range scan of the index rather than LIKE.
+        last_match = Q(term__gte=last, term__lt=last[:-1] + chr(ord(last[-1]) + 1))
+    else:
+        last_match = Q(term=last)
+    if words:
+        # A whole word that the prefix also covers only counts as that word.
+        last_match &= ~word_match
+
+    candidates = SearchTerm.objects.filter(word_match | last_match)
+    if types:
+        candidates = candidates.filter(model__in=types)
+    # Each word has at most one posting per row, so summing flags counts the words a
+    # row has; with the prefix on top, only rows matching every term remain.
+    matched = (
+        Sum(Case(When(word_match, then=Value(1)), default=Value(0)))
+        + Max(Case(When(last_match, then=Value(1)), default=Value(0)))
+    )
+    return (
+        candidates.values("model", "object_id")
+        .annotate(score=Sum("weight"), matched=matched)
+        .filter(matched=len(terms))
+        .values_list("model", "object_id", "score", named=True)
+    )
+
+
+def results(hits, request=None):
+    """
+    Load the rows behind a page of ``matches()``, one query per type, as
+    ``{"type", "id", "score", "data"}`` where ``data`` is the row as its list
+    endpoint returns it.
+    """
+    ids = defaultdict(list)
+    for hit in hits:
+        ids[hit.model].append(hit.object_id)
+
+    rows = {}
+    for name, pks in ids.items():
+        model = MODEL_TYPES[name]
+        row_serializer = _row_serializers[model]
+        queryset = row_serializer.rows(model._default_manager.filter(pk__in=pks))
+        for row in row_serializer.serialize(queryset, request):
+            rows[name, row["id"]] = row
+
+    return [
+        {"type": hit.model, "id": hit.object_id, "score": hit.score, "data": rows[hit.model, hit.object_id]}
+        for hit in hits
+        # A row deleted since the page was read is left out.
+        if (hit.model, hit.object_id) in rows
+    ]
+
+
+def _index_saved(sender, instance, update_fields=None, **kwargs):
+    fields = INDEXED_MODELS[sender][2]
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    index(sender, instance)
+
+
+def _drop_deleted(sender, instance, **kwargs):
+    SearchTerm.objects.filter(model=INDEXED_MODELS[sender][0], object_id=instance.pk).delete()
+
+
+for _model, (_name, *_rest) in INDEXED_MODELS.items():
+    post_save.connect(_index_saved, sender=_model, dispatch_uid=f"search-save-{_name}")
+    post_delete.connect(_drop_deleted, sender=_model, dispatch_uid=f"search-delete-{_name}")
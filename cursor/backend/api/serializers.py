@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 
-from .models import Job, Rental, Device, JobReport
+from .models import Job, Rental, Device, JobReport, ProcessedImage
 
 
 class AssignedToSerializer(serializers.ModelSerializer):
@@ -11,6 +11,8 @@ class AssignedToSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role']
+        # Columns get_role() reads, so RowSerializer can build it from .values() rows
+        method_field_sources = {'role': ('is_staff',)}
     
     def get_role(self, obj):
         return 'admin' if obj.is_staff else 'employee'
@@ -24,10 +26,43 @@ class JobSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class RentalDeviceSerializer(serializers.ModelSerializer):
+    """Device details embedded in rental responses"""
+
+    class Meta:
+        model = Device
+        fields = ['id', 'device_name', 'model', 'serial_no']
+
+
+class ImageVariantsSerializer(serializers.ModelSerializer):
+    """Thumbnail and web-sized variants of an uploaded photo (see api.images)"""
+
+    class Meta:
+        model = ProcessedImage
+        fields = ['thumbnail', 'web', 'width', 'height']
+
+
 class RentalSerializer(serializers.ModelSerializer):
+    device_details = RentalDeviceSerializer(source='device', read_only=True)
+    # None until the upload has been processed; all fields None if it could not be decoded
+    id_proof_variants = ImageVariantsSerializer(source='id_proof_image', read_only=True)
+
     class Meta:
         model = Rental
         fields = "__all__"
+        extra_kwargs = {
+            # Resolved from device_serial by the view
+            'device': {'read_only': True},
+            # Set by api.images after the upload commits
+            'id_proof_image': {'read_only': True},
+        }
+
+    def validate(self, attrs):
+        from_date = attrs.get('from_date', getattr(self.instance, 'from_date', None))
+        to_date = attrs.get('to_date', getattr(self.instance, 'to_date', None))
+        if from_date and to_date and from_date > to_date:
+            raise serializers.ValidationError({'to_date': 'Must not be before from_date.'})
+        return attrs
 
 
 class DeviceSerializer(serializers.ModelSerializer):
@@ -37,11 +72,15 @@ class DeviceSerializer(serializers.ModelSerializer):
 
 
 class JobReportSerializer(serializers.ModelSerializer):
+    # None until the upload has been processed; all fields None if it could not be decoded
+    completion_photo_variants = ImageVariantsSerializer(source='completion_photo_image', read_only=True)
+
     class Meta:
         model = JobReport
         fields = "__all__"
         extra_kwargs = {
-            'completion_photo': {'required': False}
+            'completion_photo': {'required': False},
+            'completion_photo_image': {'read_only': True},
         }
 
 
@@ -0,0 +1,150 @@
+"""
+Delta sync: fetch only the rows changed since a token.
+
+A sync token is an opaque ``(updated_at, id)`` position. ``?since=<token>``
+on the Job, Rental, Device and JobReport list endpoints returns the rows
+whose ``(updated_at, id)`` is past that position, oldest first, plus the ids
+deleted since then (from ``DeletedRecord`` tombstones) and a new token.
+``?since=0`` starts from the beginning, so a client can build its mirror
+through the same endpoint; full list responses also carry an
+``X-Sync-Token`` header to continue from.
+
+``updated_at`` is stamped when a row is saved, which can be slightly before
+its transaction commits. Final tokens therefore trail the clock by
+``SYNC_SAFETY_WINDOW`` seconds, and the most recent changes are sent again
+on the next poll. Clients apply ``changed`` as upserts by id, then
+``deleted``, and both steps are idempotent.
+
+List filters do not apply in ``since`` mode; clients filter their mirror
+themselves. Embedded related data such as ``assigned_to_details`` or
+``device_details`` is only refreshed when the row itself changes.
+``QuerySet.update()`` skips ``auto_now``, so code that writes synced models
+that way must set ``updated_at`` itself.
+"""
+
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .models import DeletedRecord, Device, Job, JobReport, Rental
+
+SYNCED_MODELS = {
+    Job: "job",
+    Rental: "rental",
+    Device: "device",
+    JobReport: "jobreport",
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Sync token is older than the deletion log; reload the full list."
+    default_code = "sync_token_expired"
+
+
+def safety_window():
+    return timedelta(seconds=getattr(settings, "SYNC_SAFETY_WINDOW", 5))
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_DAYS", 30))
+
+
+def encode_token(moment, pk=0):
+    micros = (moment - EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(f"{micros}:{pk}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_token(token):
+    """Return the ``(updated_at, id)`` position a token stands for."""
+    if token == "0":
+        return EPOCH, 0
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        micros, pk = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (ValueError, UnicodeError, binascii.Error, OverflowError):
+        raise ValidationError({"since": "Invalid sync token."})
+
+
+def current_token():
+    """A token that is safe to resume from for a list read starting now."""
+    return encode_token(timezone.now() - safety_window())
+
+
+def changes(model, row_serializer, token, limit, request=None):
+    """
+    Build the delta payload for ``model`` since ``token``:
+    ``{"changed": [...], "deleted": [...], "token": ..., "more": bool}``.
+    """
+    moment, pk = decode_token(token)
+    if moment != EPOCH and moment < timezone.now() - tombstone_retention():
+        raise SyncTokenExpired()
+
+    # Read the clock before the rows so the final token cannot skip anything we miss.
+    final_token = current_token()
+
+    queryset = model._default_manager.filter(
+        Q(updated_at__gt=moment) | Q(updated_at=moment, id__gt=pk)
+    ).order_by("updated_at", "id")
+    rows = list(row_serializer.rows(queryset)[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    deleted = []
+    if moment != EPOCH:  # a fresh mirror has nothing to delete
+        deleted = list(
+            DeletedRecord.objects.filter(model=SYNCED_MODELS[model], deleted_at__gt=moment)
+            .order_by("deleted_at")
+            .values_list("object_id", flat=True)
+        )
+
+    if more:
+        last = rows[-1]
+        next_token = encode_token(last.updated_at, last.id)
+    else:
+        next_token = final_token
+
+    return {
+        "changed": row_serializer.serialize(rows, request),
+        "deleted": deleted,
+        "token": next_token,
+        "more": more,
+    }
+
+
+class DeltaSyncMixin:
+    """
+    Add ``?since=<token>`` delta mode to a ``RowSerializedListMixin`` list,
+    and an ``X-Sync-Token`` header to full list responses.
+    """
+
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+        if since is None:
+            token = current_token()
+            response = super().list(request, *args, **kwargs)
+            response["X-Sync-Token"] = token
+            return response
+
+        model = self.queryset.model
+        limit = self.paginator.get_page_size(request) if self.paginator else 500
+        return Response(changes(model, self.row_serializer, since, limit, request))
+
+
+def _record_deletion(sender, instance, **kwargs):
+    DeletedRecord.objects.create(model=SYNCED_MODELS[sender], object_id=instance.pk)
+
+
+for _model, _name in SYNCED_MODELS.items():
+    post_delete.connect(_record_deletion, sender=_model, dispatch_uid=f"sync-delete-{_name}")
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+@override_settings(TOKEN_CACHE_ALIAS="default", TOKEN_CACHE_TTL=60)
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret-pw", is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_warm_cache_request_makes_no_queries(self):
+        self.assertEqual(self.client.get("/api/auth/profile/").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/auth/profile/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "alice@example.com")
+        self.assertEqual(response.data["role"], "admin")
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.get("/api/auth/profile/")
+        entry = caches["default"].get(f"auth-token:{self.token.key}")
+        self.assertNotIn("password", entry)
+        self.assertNotIn(self.user.password, entry.values())
+
+    def test_deactivation_revokes_cached_token(self):
+        self.assertEqual(self.client.get("/api/auth/profile/").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/auth/profile/").status_code, 401)
+
+    def test_promotion_refreshes_cached_user(self):
+        self.client.get("/api/auth/profile/")
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/auth/profile/").data["role"], "employee")
+
+    def test_deleted_token_is_refused(self):
+        self.client.get("/api/auth/profile/")
+        self.token.delete()
+        self.assertEqual(self.client.get("/api/auth/profile/").status_code, 401)
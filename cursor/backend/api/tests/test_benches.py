@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+
+# The benches drive the full stack from worker threads, so they need committed
+# data; one thread keeps SQLite from rejecting concurrent writers. The
+# default ALLOWED_HOSTS checks that their clients send an accepted Host.
+@override_settings(ALLOWED_HOSTS=["localhost", "127.0.0.1"])
+class BenchCommandSmokeTests(TransactionTestCase):
+    serialized_rollback = True  # keep the seeded dashboard counters
+
+    def bench(self, name, *args):
+        out = StringIO()
+        call_command(name, *args, "--threads", "1", stdout=out)
+        return out.getvalue()
+
+    def test_bench_job_claims(self):
+        output = self.bench("bench_job_claims", "--jobs", "2", "--claims", "5", "--employees", "3")
+        self.assertNotIn("other statuses", output)
+        self.assertIn("exactly one winner per job: True", output)
+
+    def test_bench_login(self):
+        output = self.bench("bench_login", "--users", "2", "--logins", "4", "--fast-hasher")
+        self.assertIn("all logins succeeded: True", output)
+
+    def test_bench_rentals(self):
+        output = self.bench("bench_rentals", "--devices", "2", "--requests", "8")
+        self.assertIn("no overlapping bookings, every rental returned exactly once: True", output)
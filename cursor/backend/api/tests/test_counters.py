@@ -0,0 +1,38 @@
+import threading
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from api import counters
+from api.models import DashboardCounter
+
+
+class BumpMissingCounterTests(TransactionTestCase):
+    def test_concurrent_first_bumps_are_both_counted(self):
+        """Two connections creating the same counter row must not lose a delta."""
+        start = threading.Barrier(2)
+        errors = []
+
+        def bump():
+            try:
+                start.wait()
+                with transaction.atomic():
+                    counters._bump({"test.race"}, 1)
+            except Exception as exc:  # surfaced by the assertion below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=bump) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(DashboardCounter.objects.get(key="test.race").value, 2)
+
+    def test_bump_creates_missing_counter_with_delta(self):
+        counters._bump({"test.fresh"}, 3)
+        counters._bump({"test.fresh"}, -1)
+        self.assertEqual(DashboardCounter.objects.get(key="test.fresh").value, 2)
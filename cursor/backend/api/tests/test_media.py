@@ -0,0 +1,120 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from channels.testing import HttpCommunicator
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from api import images, media
+from api.models import Device, Rental
+
+
+def jpeg(color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def stored_upload(name, content):
+    """An already-saved upload, as ``api.images`` receives it from a model field."""
+    field = Rental._meta.get_field("id_proof")
+    return FieldFile(None, field, field.storage.save(name, ContentFile(content)))
+
+
+class PrivateMediaTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, IMAGE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user("admin", "admin@example.com", "pw", is_staff=True)
+        self.token = Token.objects.create(user=self.user).key
+        Device.objects.create(serial_no="SN-1", model="X1")
+
+    def rent_with_id_proof(self):
+        rental = Rental(
+            customer_name="Customer", phone_number="555", device_serial="SN-1",
+            from_date="2026-11-01", to_date="2026-11-02", rental_days=2, security_deposit="10.00",
+        )
+        rental.id_proof.save("id.jpg", ContentFile(jpeg()), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            rental.save()
+        rental.refresh_from_db()
+        return rental
+
+    def get(self, name, **headers):
+        return self.client.get(f"/media/{name}", **headers)
+
+    def test_id_proof_variants_need_credentials(self):
+        rental = self.rent_with_id_proof()
+        web = rental.id_proof_image.web.name
+        self.assertTrue(web.startswith("images/private/"), web)
+
+        self.assertEqual(self.get(web).status_code, 401)
+        self.assertEqual(self.get(f"images/x/../private/{web[len('images/private/'):]}").status_code, 401)
+        response = self.get(web, HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+    def test_other_variants_stay_public(self):
+        processed = images.variants_for(stored_upload("reports/p.jpg", jpeg("blue")))
+        response = self.get(processed.web.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_reused_public_variants_become_private(self):
+        public = images.variants_for(stored_upload("reports/p.jpg", jpeg()))
+        old_web = public.web.name
+        self.assertFalse(old_web.startswith("images/private/"))
+
+        rental = self.rent_with_id_proof()
+        self.assertEqual(rental.id_proof_image_id, public.pk)
+        self.assertTrue(rental.id_proof_image.web.name.startswith("images/private/"))
+        self.assertFalse(default_storage.exists(old_web))
+
+    def id_proof_url(self, rental):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        response = self.client.get(f"/api/rentals/{rental.pk}/")
+        self.client.credentials()
+        url = urlsplit(response.data["id_proof"])
+        self.assertIn("signature=", url.query)
+        return url.path, url.query
+
+    def test_api_links_private_files_with_signed_urls(self):
+        path, query = self.id_proof_url(self.rent_with_id_proof())
+        self.assertEqual(self.client.get(f"{path}?{query}").status_code, 200)
+        self.assertEqual(self.client.get(path).status_code, 401)
+        self.assertEqual(self.client.get(f"{path}?{query.replace('signature=', 'signature=x')}").status_code, 401)
+        # The API token is not accepted in the URL.
+        self.assertEqual(self.client.get(f"{path}?token={self.token}").status_code, 401)
+
+    def test_signed_urls_expire(self):
+        path, query = self.id_proof_url(self.rent_with_id_proof())
+        expires = int(dict(part.split("=", 1) for part in query.split("&"))["expires"])
+        with mock.patch("api.media.time.time", return_value=expires + 1):
+            self.assertEqual(self.client.get(f"{path}?{query}").status_code, 401)
+
+    def test_asgi_handler_serves_signed_urls(self):
+        path, query = self.id_proof_url(self.rent_with_id_proof())
+
+        async def django(scope, receive, send):
+            await send({"type": "http.response.start", "status": 401, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        handler = media.MediaFilesHandler(django)
+        signed = async_to_sync(HttpCommunicator(handler, "GET", f"{path}?{query}").get_response)()
+        self.assertEqual(signed["status"], 200)
+        unsigned = async_to_sync(HttpCommunicator(handler, "GET", path).get_response)()
+        self.assertEqual(unsigned["status"], 401)
@@ -0,0 +1,66 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Device, Rental
+
+
+class RentalBookingTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", "admin@example.com", "pw", is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.device = Device.objects.create(serial_no="SN-1", model="X1")
+        self.today = timezone.localdate()
+
+    def book(self, start, end, serial="SN-1"):
+        return self.client.post("/api/rentals/", {
+            "customer_name": "Customer",
+            "phone_number": "555",
+            "device_serial": serial,
+            "from_date": start.isoformat(),
+            "to_date": end.isoformat(),
+            "rental_days": (end - start).days + 1,
+            "security_deposit": "100.00",
+        }, format="json")
+
+    def days(self, n):
+        return self.today + datetime.timedelta(days=n)
+
+    def test_future_booking_on_device_rented_now(self):
+        current = self.book(self.today, self.days(5))
+        self.assertEqual(current.status_code, 201, current.data)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.availability, "rented")
+
+        listed = self.client.get("/api/devices/available/", {
+            "from": self.days(10).isoformat(), "to": self.days(12).isoformat(),
+        })
+        self.assertEqual(listed.status_code, 200)
+        self.assertIn(self.device.pk, [row["id"] for row in listed.data["results"]])
+
+        future = self.book(self.days(10), self.days(12))
+        self.assertEqual(future.status_code, 201, future.data)
+        self.assertEqual(Rental.objects.get(pk=future.data["id"]).device_id, self.device.pk)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.availability, "rented")
+
+    def test_overlapping_booking_is_rejected(self):
+        self.assertEqual(self.book(self.days(10), self.days(12)).status_code, 201)
+        self.assertEqual(self.book(self.days(12), self.days(14)).status_code, 409)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.availability, "available")
+
+    def test_return_frees_device_for_today_only(self):
+        current = self.book(self.today, self.days(5))
+        self.book(self.days(10), self.days(12))
+        response = self.client.post(f"/api/rentals/{current.data['id']}/return/")
+        self.assertEqual(response.status_code, 200)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.availability, "available")
+        self.assertEqual(self.book(self.days(11), self.days(13)).status_code, 409)
+
+    def test_maintenance_device_cannot_be_booked(self):
+        Device.objects.filter(pk=self.device.pk).update(availability="maintenance")
+        self.assertEqual(self.book(self.days(10), self.days(12)).status_code, 409)
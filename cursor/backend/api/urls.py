@@ -5,7 +5,7 @@ from rest_framework.authtoken.views import obtain_auth_token
 from .views import (
     JobViewSet, RentalViewSet, DeviceViewSet, JobReportViewSet,
     login_user, register_user, get_user_profile, get_dashboard_stats, get_all_users,
-    delete_user
+    delete_user, search_records, get_metrics, get_slow_requests
 )
 
 router = DefaultRouter()
@@ -23,6 +23,11 @@ urlpatterns = [
     path("auth/profile/", get_user_profile, name="api-profile"),
     # Dashboard stats
     path("dashboard/stats/", get_dashboard_stats, name="api-dashboard-stats"),
+    # Search
+    path("search/", search_records, name="api-search"),
+    # Metrics
+    path("metrics/", get_metrics, name="api-metrics"),
+    path("metrics/slow/", get_slow_requests, name="api-metrics-slow"),
     # Users
     path("users/", get_all_users, name="api-users-list"),
     path("users/<int:user_id>/delete/", delete_user, name="api-user-delete"),
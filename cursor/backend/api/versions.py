@@ -0,0 +1,98 @@
+"""
+Per-model version stamps and conditional GET.
+
+Every write to a versioned model bumps its ``ModelVersion`` row in the same
+transaction (see ``TrackedModel``). A response's ETag is derived from the
+stamps of the models it reads plus the request path, user and host (and
+the window of the signed media URLs it may embed, see ``api.media``), so
+``conditional_get`` can answer ``If-None-Match`` / ``If-Modified-Since``
+with ``304 Not Modified`` after a single read of the stamp table, before
+the view's own query or serializer runs.
+
+Bulk ``QuerySet.update()`` / ``bulk_create()`` bypass signals; code that
+writes that way must call ``bump()`` itself.
+"""
+
+import hashlib
+import time
+
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import media
+from .models import Device, Job, JobReport, ModelVersion, Rental
+
+VERSIONED_MODELS = {
+    Job: "job",
+    Rental: "rental",
+    Device: "device",
+    JobReport: "jobreport",
+    User: "user",
+}
+
+
+def bump(*names):
+    """Advance the version stamp of the named models."""
+    now = timezone.now()
+    for name in sorted(set(names)):  # fixed lock order
+        updated = ModelVersion.objects.filter(name=name).update(version=F("version") + 1, updated_at=now)
+        if not updated:
+            ModelVersion.objects.get_or_create(name=name, defaults={"version": 1, "updated_at": now})
+
+
+def validators(request, names):
+    """
+    Return ``(etag, last_modified)`` for a response built from ``names``.
+
+    ``last_modified`` is a Unix timestamp, or None when it cannot be used.
+    """
+    stamps = sorted(ModelVersion.objects.filter(name__in=names).values_list("name", "version", "updated_at"))
+    key = "|".join(
+        [request.get_full_path(), request.get_host(), str(request.user.pk), str(media.signing_window())]
+        + [f"{name}:{version}" for name, version, _updated in stamps]
+    )
+    etag = '"%s"' % hashlib.sha1(key.encode("utf-8")).hexdigest()
+    last_modified = max((int(updated.timestamp()) for _name, _version, updated in stamps), default=None)
+    # HTTP dates have one-second resolution: a later write within the same
+    # second would look unmodified to If-Modified-Since, so only advertise
+    # Last-Modified once that second is over. The ETag still applies.
+    if last_modified is not None and last_modified >= int(time.time()):
+        last_modified = None
+    return etag, last_modified
+
+
+def conditional_get(request, names, build):
+    """
+    Serve a GET built by ``build()`` from the models in ``names`` with
+    ETag / Last-Modified validators, short-circuiting to 304 when the
+    client's copy is current.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return build()
+
+    etag, last_modified = validators(request, names)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # Let browsers keep the copy but revalidate it on every use.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _bump_for(sender, **kwargs):
+    bump(VERSIONED_MODELS[sender])
+
+
+for _model, _name in VERSIONED_MODELS.items():
+    post_save.connect(_bump_for, sender=_model, dispatch_uid=f"versions-save-{_name}")
+    post_delete.connect(_bump_for, sender=_model, dispatch_uid=f"versions-delete-{_name}")
@@ -1,130 +1,489 @@
+import hmac
 import logging
 from rest_framework import viewsets, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework.authtoken.models import Token
 from django.utils import timezone
-from django.db import transaction
+from django.utils.dateparse import parse_date
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 
+from . import availability, counters, device_cache, events, metrics, search, versions
+from .backends import EmailKey
 from .models import Job, Rental, Device, JobReport
+from .pagination import SearchPagination, UserDirectoryPagination
+from .exports import ExportMixin
+from .imports import BulkImportMixin
+from .row_serializers import RowSerializer
+from .sync import DeltaSyncMixin
 from .serializers import JobSerializer, RentalSerializer, DeviceSerializer, JobReportSerializer
 
 logger = logging.getLogger(__name__)
 
 
-class JobViewSet(viewsets.ModelViewSet):
-    queryset = Job.objects.all().order_by("-created_at")
+def _date_param(params, name):
+    """Parse an optional YYYY-MM-DD query parameter, rejecting malformed values."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Expected a date in YYYY-MM-DD format."})
+    return parsed
+
+
+def _device_availability_changed(device, old, new):
+    """
+    Apply what the Device signal handlers would for an availability change
+    made with ``QuerySet.update()``: counters, version stamp, serial cache
+    and the admin event. ``updated_at`` is set by the caller's update().
+    """
+    counters.record_change(Device, (old,), (new,))
+    versions.bump('device')
+    serial = device.serial_no
+    device_cache.invalidate(serial)
+    transaction.on_commit(lambda: device_cache.invalidate(serial))
+    events.publish('device.updated', Device, device.pk, groups=(events.ADMINS,))
+
+
+def _sync_device_availability(device):
+    """
+    Derive ``device.availability`` from its calendar: ``rented`` while an
+    active rental covers today, ``available`` otherwise. Bookings are checked
+    against the calendar, not this flag, so a device out today can still be
+    booked for later dates. Devices in maintenance are left alone. Call with
+    the device row locked.
+    """
+    if device.availability == 'maintenance':
+        return
+    today = timezone.localdate()
+    busy = availability.overlapping(today, today).filter(device=device).exists()
+    new = 'rented' if busy else 'available'
+    if new != device.availability:
+        Device.objects.filter(pk=device.pk).update(availability=new, updated_at=timezone.now())
+        _device_availability_changed(device, device.availability, new)
+        device.availability = new
+
+
+class RowSerializedListMixin:
+    """
+    Serve ``list`` from a precompiled ``RowSerializer``: one narrow
+    ``values_list()`` query (nested relations joined in) and no model
+    instances or per-field DRF dispatch, with JSON identical to
+    ``serializer_class``.
+    """
+
+    row_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.row_serializer.rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_rows(page))
+
+        return Response(self.serialize_rows(queryset))
+
+    def serialize_rows(self, rows):
+        return self.row_serializer.serialize(rows, self.request)
+
+
+class ConditionalGetMixin:
+    """
+    Answer list/retrieve GETs with ETag and Last-Modified validators derived
+    from the version stamps of ``etag_models`` (see ``api.versions``), and
+    with 304 Not Modified before any query or serialization when the client
+    copy is still current.
+    """
+
+    etag_models = ()
+
+    def get_etag_models(self):
+        return self.etag_models
+
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        return versions.conditional_get(request, self.get_etag_models(), lambda: build(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        build = super().retrieve
+        return versions.conditional_get(request, self.get_etag_models(), lambda: build(request, *args, **kwargs))
+
+
+class JobViewSet(ConditionalGetMixin, DeltaSyncMixin, BulkImportMixin, ExportMixin, RowSerializedListMixin, viewsets.ModelViewSet):
+    queryset = Job.objects.select_related("assigned_to").order_by("-created_at")
     serializer_class = JobSerializer
+    row_serializer = RowSerializer(JobSerializer)
+    etag_models = ('job', 'user')
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        """
+        Narrow the job list with optional query parameters so each screen
+        only reads the rows it shows:
+
+        ?status=open  ?priority=high  ?assigned_to=<user id>|me
+        ?work_date__gte=YYYY-MM-DD  ?work_date__lte=YYYY-MM-DD
+        """
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'export'):
+            return queryset
+
+        params = self.request.query_params
+
+        job_status = params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+
+        priority = params.get('priority')
+        if priority:
+            queryset = queryset.filter(priority=priority)
+
+        assigned_to = params.get('assigned_to')
+        if assigned_to:
+            if assigned_to == 'me':
+                assigned_to = self.request.user.id
+            elif not assigned_to.isdigit():
+                raise ValidationError({'assigned_to': "Expected a user id or 'me'."})
+            queryset = queryset.filter(assigned_to_id=assigned_to)
+
+        work_date_gte = _date_param(params, 'work_date__gte')
+        if work_date_gte:
+            queryset = queryset.filter(work_date__gte=work_date_gte)
+
+        work_date_lte = _date_param(params, 'work_date__lte')
+        if work_date_lte:
+            queryset = queryset.filter(work_date__lte=work_date_lte)
+
+        return queryset
+
+    def get_etag_models(self):
+        if self.request.query_params.get('include') == 'latest_report':
+            return self.etag_models + ('jobreport',)
+        return self.etag_models
+
+    def get_export_columns(self):
+        columns = super().get_export_columns()
+        if self.request.query_params.get('include') == 'latest_report':
+            columns.append('latest_report')
+        return columns
+
+    def serialize_rows(self, rows):
+        """
+        With ?include=latest_report, embed each job's most recent report,
+        fetched for the whole page in one query.
+        """
+        data = super().serialize_rows(rows)
+        if self.request.query_params.get('include') == 'latest_report':
+            report_serializer = JobReportViewSet.row_serializer
+            reports = JobReport.objects.filter(
+                job_id__in=[job['id'] for job in data]
+            ).order_by('job', '-created_at', '-id')
+            latest = {}
+            for report in report_serializer.serialize(report_serializer.rows(reports), self.request):
+                latest.setdefault(report['job'], report)
+            for job in data:
+                job['latest_report'] = latest.get(job['id'])
+        return data
+
     def create(self, request, *args, **kwargs):
-        logger.info(f"Creating job with data: {request.data}")
+        logger.info("Creating job", extra={"event": "job.create", "data": request.data})
         return super().create(request, *args, **kwargs)
 
     def list(self, request, *args, **kwargs):
-        logger.info("Listing jobs")
+        logger.info("Listing jobs", extra={"event": "job.list"})
         return super().list(request, *args, **kwargs)
 
     def partial_update(self, request, *args, **kwargs):
         """Handle PATCH requests for partial updates (e.g., status change)."""
-        logger.info(f"Partially updating job {kwargs.get('pk')} with data: {request.data}")
-        
-        # Get the job instance
-        instance = self.get_object()
-        new_status = request.data.get('status')
-        
-        # If status is changing from 'open' to 'in_progress', assign to current user
-        if instance.status == 'open' and new_status == 'in_progress':
-            request.data['assigned_to'] = request.user.id
-            request.data['assigned_at'] = timezone.now()
-            logger.info(f"Job {kwargs.get('pk')} assigned to user {request.user.username}")
-        
+        logger.info(
+            "Partially updating job %s", kwargs.get('pk'),
+            extra={"event": "job.partial_update", "data": request.data},
+        )
+
+        # A bare {"status": "in_progress"} is a claim; older clients send it this way.
+        if set(request.data) == {'status'} and request.data.get('status') == 'in_progress':
+            return self.claim(request, pk=kwargs.get('pk'))
+
         return super().partial_update(request, *args, **kwargs)
 
+    @action(detail=True, methods=['post'])
+    def claim(self, request, pk=None):
+        """
+        Take an open job: one ``UPDATE ... WHERE id = %s AND status = 'open'``,
+        so of several employees claiming the same job exactly one wins and
+        the rest get 409 Conflict.
+        """
+        if not str(pk).isdigit():
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        now = timezone.now()
+        with transaction.atomic():
+            # update() skips signals; counters, versions and events are applied by hand.
+            claimed = Job.objects.filter(pk=pk, status='open').update(
+                status='in_progress', assigned_to=request.user, assigned_at=now, updated_at=now,
+            )
+            if claimed:
+                counters.record_change(Job, ('open',), ('in_progress',))
+                versions.bump('job')
+                events.publish('job.claimed', Job, int(pk))
+
+        if not claimed:
+            if not Job.objects.filter(pk=pk).exists():
+                return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response(
+                {"error": "This job has already been taken"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        logger.info("Job %s claimed by user %s", pk, request.user.username, extra={"event": "job.claim"})
+        rows = self.row_serializer.rows(self.get_queryset().filter(pk=pk))
+        return Response(self.serialize_rows(rows)[0])
+
     def update(self, request, *args, **kwargs):
         """Handle PUT/PATCH requests."""
-        logger.info(f"Updating job {kwargs.get('pk')} with data: {request.data}")
+        logger.info("Updating job %s", kwargs.get('pk'), extra={"event": "job.update", "data": request.data})
         return super().update(request, *args, **kwargs)
 
 
-class RentalViewSet(viewsets.ModelViewSet):
-    queryset = Rental.objects.all().order_by("-created_at")
+class RentalViewSet(ConditionalGetMixin, DeltaSyncMixin, ExportMixin, RowSerializedListMixin, viewsets.ModelViewSet):
+    queryset = Rental.objects.select_related("device", "id_proof_image").order_by("-created_at")
     serializer_class = RentalSerializer
+    row_serializer = RowSerializer(RentalSerializer)
+    etag_models = ('rental', 'device')
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        """Optionally narrow the rental list (and export) with ?status=active|returned."""
+        queryset = super().get_queryset()
+        rental_status = self.request.query_params.get('status')
+        if self.action in ('list', 'export') and rental_status:
+            queryset = queryset.filter(status=rental_status)
+        return queryset
+
     @transaction.atomic
     def create(self, request, *args, **kwargs):
-        logger.info(f"Creating rental with data: {request.data}")
-        logger.info(f"Files: {request.FILES}")
+        logger.info("Creating rental", extra={"event": "rental.create", "data": request.data, "files": request.FILES})
         device_serial = request.data.get('device_serial')
-        try:
-            device = Device.objects.get(serial_no=device_serial)
-            device.availability = 'rented'
-            device.save()
-        except Device.DoesNotExist:
-            logger.error(f"Device with serial {device_serial} does not exist")
+        # Lock the device row: concurrent bookings of the same device are
+        # checked against its calendar one at a time.
+        device = Device.objects.select_for_update().filter(serial_no=device_serial).first()
+        if device is None:
+            logger.error("Device with serial %s does not exist", device_serial)
             return Response({"error": "Device not found"}, status=status.HTTP_400_BAD_REQUEST)
+        if device.availability == 'maintenance':
+            return Response(
+                {"error": "Device is not available (currently maintenance)"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        self.rental_device = device
         return super().create(request, *args, **kwargs)
 
+    def perform_create(self, serializer):
+        device = self.rental_device
+        availability.check_free(
+            device, serializer.validated_data['from_date'], serializer.validated_data['to_date'],
+        )
+        serializer.save(device=device)
+        _sync_device_availability(device)
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        rental = self.get_object()
+        device_serial = request.data.get('device_serial')
+        moving = device_serial is not None and device_serial != rental.device_serial
+        current = rental.device_id
+        if current is None:
+            current = Device.objects.filter(serial_no=rental.device_serial).values_list('pk', flat=True).first()
+        target = current
+        if moving:
+            target = Device.objects.filter(serial_no=device_serial).values_list('pk', flat=True).first()
+            if target is None:
+                logger.error("Device with serial %s does not exist", device_serial)
+                return Response({"error": "Device not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Lock every device the update touches, in pk order so that two
+        # rentals moving between the same devices cannot deadlock.
+        locked = {
+            device.pk: device
+            for device in Device.objects.select_for_update().filter(pk__in={current, target} - {None}).order_by('pk')
+        }
+        self.rental_device = locked.get(target)
+        self.previous_device = locked.get(current) if moving else None
+        if (
+            moving
+            and request.data.get('status', rental.status) == 'active'
+            and self.rental_device.availability == 'maintenance'
+        ):
+            return Response(
+                {"error": "Device is not available (currently maintenance)"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        rental = serializer.instance
+        device = self.rental_device
+        from_date = serializer.validated_data.get('from_date', rental.from_date)
+        to_date = serializer.validated_data.get('to_date', rental.to_date)
+        new_status = serializer.validated_data.get('status', rental.status)
+        if device is not None and new_status == 'active':
+            availability.check_free(device, from_date, to_date, exclude=rental)
+        serializer.save(device=device)
+        # New dates, status or device can change which device is out today
+        for touched in (device, self.previous_device):
+            if touched is not None:
+                _sync_device_availability(touched)
+
     @action(detail=True, methods=['post'], url_path='return')
     def return_rental(self, request, pk=None):
         """Mark a rental as returned and make the device available again."""
         try:
             rental = self.get_object()
-            
-            if rental.status == 'returned':
-                return Response(
-                    {"error": "This rental has already been returned"},
-                    status=status.HTTP_400_BAD_REQUEST
+            now = timezone.now()
+
+            with transaction.atomic():
+                # Conditional UPDATEs: a concurrent second return matches nothing.
+                returned = Rental.objects.filter(pk=rental.pk, status='active').update(
+                    status='returned', updated_at=now,
                 )
-            
-            # Update rental status
-            rental.status = 'returned'
-            rental.save()
-            
-            # Make device available again
-            try:
-                device = Device.objects.get(serial_no=rental.device_serial)
-                device.availability = 'available'
-                device.save()
-                logger.info(f"Device {rental.device_serial} marked as available")
-            except Device.DoesNotExist:
-                logger.warning(f"Device {rental.device_serial} not found when returning rental")
-            
-            logger.info(f"Rental {rental.id} marked as returned")
+                if not returned:
+                    return Response(
+                        {"error": "This rental has already been returned"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                counters.record_change(Rental, ('active',), ('returned',))
+                versions.bump('rental')
+                events.publish('rental.returned', Rental, rental.pk, groups=(events.ADMINS,))
+
+                # Make device available again, unless another booking covers today
+                lookup = {'pk': rental.device_id} if rental.device_id else {'serial_no': rental.device_serial}
+                device = Device.objects.select_for_update().filter(**lookup).first()
+                if device is not None:
+                    _sync_device_availability(device)
+                    logger.info("Device %s is now %s", rental.device_serial, device.availability)
+                else:
+                    logger.warning("Device %s not found when returning rental", rental.device_serial)
+
+            logger.info("Rental %s marked as returned", rental.id)
             return Response({
                 "message": "Rental marked as returned successfully",
                 "rental_id": rental.id,
                 "device_serial": rental.device_serial
             })
-            
+
         except Rental.DoesNotExist:
             return Response(
                 {"error": "Rental not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            logger.error(f"Error returning rental: {str(e)}")
+            logger.error("Error returning rental: %s", e)
             return Response(
                 {"error": "Failed to process return"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
-class DeviceViewSet(viewsets.ModelViewSet):
+class DeviceViewSet(ConditionalGetMixin, DeltaSyncMixin, BulkImportMixin, RowSerializedListMixin, viewsets.ModelViewSet):
     queryset = Device.objects.all().order_by("model")
     serializer_class = DeviceSerializer
+    row_serializer = RowSerializer(DeviceSerializer)
+    etag_models = ('device',)
     permission_classes = [IsAuthenticated]
-
-
-class JobReportViewSet(viewsets.ModelViewSet):
-    queryset = JobReport.objects.all().order_by("-created_at")
+    pagination_ordering = ("model", "id")
+    max_serial_lookup = 500
+
+    @action(detail=False, methods=['get'], url_path='by-serial')
+    def by_serial(self, request):
+        """
+        Bulk lookup by serial number: ?serial_no__in=A,B,C returns the
+        matching devices in request order. Served from ``api.device_cache``.
+        """
+        serials = list(dict.fromkeys(
+            value for value in request.query_params.get('serial_no__in', '').split(',') if value
+        ))
+        if not serials:
+            raise ValidationError({'serial_no__in': 'Expected a comma-separated list of serial numbers.'})
+        if len(serials) > self.max_serial_lookup:
+            raise ValidationError({'serial_no__in': f'At most {self.max_serial_lookup} serial numbers per request.'})
+
+        found = device_cache.lookup(serials)
+        return Response([found[serial] for serial in serials if found[serial] is not None])
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """
+        Devices free for the whole of ?from=YYYY-MM-DD&to=YYYY-MM-DD: not in
+        maintenance and with no active rental overlapping those dates (see
+        ``api.availability``). Paginated like the device list.
+        """
+        from_date = _date_param(request.query_params, 'from')
+        to_date = _date_param(request.query_params, 'to')
+        if from_date is None or to_date is None:
+            raise ValidationError({'from': 'Both from and to dates are required.'})
+        if from_date > to_date:
+            raise ValidationError({'to': 'Must not be before from.'})
+
+        def build():
+            queryset = availability.available_devices(from_date, to_date, self.get_queryset())
+            page = self.paginate_queryset(self.row_serializer.rows(queryset))
+            return self.get_paginated_response(self.serialize_rows(page))
+
+        return versions.conditional_get(request, ('device', 'rental'), build)
+
+    @action(detail=False, methods=['get'], url_path=r'by-serial/(?P<serial_no>[^/]+)')
+    def by_serial_detail(self, request, serial_no=None):
+        """Look up a single device by serial number, served from ``api.device_cache``."""
+        device = device_cache.get(serial_no)
+        if device is None:
+            return Response({"error": "Device not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(device)
+
+
+class JobReportViewSet(ConditionalGetMixin, DeltaSyncMixin, RowSerializedListMixin, viewsets.ModelViewSet):
+    queryset = JobReport.objects.select_related("completion_photo_image").order_by("-created_at")
     serializer_class = JobReportSerializer
+    row_serializer = RowSerializer(JobReportSerializer)
+    etag_models = ('jobreport',)
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        """
+        Optionally narrow the report list to one job (?job=<id>) or a batch
+        of jobs (?job__in=1,2,3), served from the (job, -created_at) index.
+        """
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'export'):
+            return queryset
+
+        params = self.request.query_params
+
+        job = params.get('job')
+        if job:
+            if not job.isdigit():
+                raise ValidationError({'job': 'Expected a job id.'})
+            queryset = queryset.filter(job_id=job)
+
+        job_in = params.get('job__in')
+        if job_in:
+            ids = [value for value in job_in.split(',') if value]
+            if not all(value.isdigit() for value in ids):
+                raise ValidationError({'job__in': 'Expected a comma-separated list of job ids.'})
+            queryset = queryset.filter(job_id__in=ids)
+
+        return queryset
+
 
 # Authentication API endpoints
 
@@ -143,20 +502,14 @@ def login_user(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Find user by email (username field stores email)
-    try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
-        return Response(
-            {'error': 'Invalid credentials'},
-            status=status.HTTP_401_UNAUTHORIZED
-        )
-
-    # Authenticate using username (which is email)
-    user = authenticate(username=user.username, password=password)
+    # One indexed, case-insensitive query for the user and their token (api.backends)
+    user = authenticate(request, email=email, password=password)
 
     if user is not None:
-        token, created = Token.objects.get_or_create(user=user)
+        try:
+            token = user.auth_token
+        except Token.DoesNotExist:
+            token, created = Token.objects.get_or_create(user=user)
 
         # Determine role based on is_staff flag
         role = 'admin' if user.is_staff else 'employee'
@@ -196,29 +549,41 @@ def register_user(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Check if user already exists
-    if User.objects.filter(email=email).exists():
+    # Check if user already exists: email (ignoring case) or username, in one query
+    taken = list(
+        User.objects.alias(email_key=EmailKey('email'))
+        .filter(Q(email_key=email.lower()) | Q(username=username))
+        .values_list('username', 'email')
+    )
+    if any(existing_email.lower() == email.lower() for _username, existing_email in taken):
         return Response(
             {'error': 'User with this email already exists'},
             status=status.HTTP_400_BAD_REQUEST
         )
-
-    if User.objects.filter(username=username).exists():
+    if taken:
         return Response(
             {'error': 'Username already taken'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Create user
-    user = User.objects.create_user(
-        username=username,
-        email=email,
-        password=password,
-        is_staff=(role == 'admin'),  # Admin users have is_staff=True
-    )
+    try:
+        with transaction.atomic():
+            # Create user
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=password,
+                is_staff=(role == 'admin'),  # Admin users have is_staff=True
+            )
 
-    # Create token for the new user
-    token, created = Token.objects.get_or_create(user=user)
+            # Create token for the new user
+            token = Token.objects.create(user=user)
+    except IntegrityError:
+        # Registered concurrently; the unique indexes decided.
+        return Response(
+            {'error': 'User with this email or username already exists'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
     return Response({
         'message': 'User created successfully',
@@ -256,72 +621,175 @@ def get_dashboard_stats(request):
     """
     Get dashboard statistics for admin.
     Requires authentication.
+
+    Served from the incrementally maintained counters in ``api.counters``
+    (a single read) rather than counting each table on every visit, and
+    answered with 304 while the underlying models are unchanged.
     """
-    total_jobs = Job.objects.count()
-    open_jobs = Job.objects.filter(status='open').count()
-    in_progress_jobs = Job.objects.filter(status='in_progress').count()
-    completed_jobs = Job.objects.filter(status='completed').count()
+    return versions.conditional_get(request, ('job', 'rental', 'device', 'user'), _dashboard_stats_response)
 
-    total_rentals = Rental.objects.count()
-    active_rentals = Rental.objects.filter(status='active').count()
-    completed_rentals = Rental.objects.filter(status='returned').count()
 
-    total_devices = Device.objects.count()
-    available_devices = Device.objects.filter(availability='available').count()
-    rented_devices = Device.objects.filter(availability='rented').count()
+def _dashboard_stats_response():
+    counts = counters.snapshot()
 
-    total_users = User.objects.filter(is_active=True).count()
-    admin_users = User.objects.filter(is_staff=True, is_active=True).count()
-    employee_users = User.objects.filter(is_staff=False, is_active=True).count()
+    def count(key):
+        return counts.get(key, 0)
 
     return Response({
         'jobs': {
-            'total': total_jobs,
-            'open': open_jobs,
-            'in_progress': in_progress_jobs,
-            'completed': completed_jobs,
+            'total': count('job.total'),
+            'open': count('job.open'),
+            'in_progress': count('job.in_progress'),
+            'completed': count('job.completed'),
         },
         'rentals': {
-            'total': total_rentals,
-            'active': active_rentals,
-            'completed': completed_rentals,
+            'total': count('rental.total'),
+            'active': count('rental.active'),
+            'completed': count('rental.returned'),
         },
         'devices': {
-            'total': total_devices,
-            'available': available_devices,
-            'rented': rented_devices,
+            'total': count('device.total'),
+            'available': count('device.available'),
+            'rented': count('device.rented'),
         },
         'users': {
-            'total': total_users,
-            'admins': admin_users,
-            'employees': employee_users,
+            'total': count('user.total'),
+            'admins': count('user.admin'),
+            'employees': count('user.employee'),
         },
     })
 
 
+def _prefix_range(field, prefix):
+    """
+    ``field`` starts with ``prefix`` as an index range, ``prefix <= field <
+    prefix + 1``: unlike ``LIKE``, every backend serves it from an index on
+    the (lower-cased) expression.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_all_users(request):
     """
-    Get all active users with their details.
-    Requires authentication (admin only recommended).
+    Directory of active users, newest first, keyset-paginated like the
+    other list endpoints ({"next", "previous", "results"}).
+
+    ?search=<prefix>  username or email starting with it, ignoring case
+    ?role=admin|employee
+
+    Reads a narrow ``values_list()`` projection through the indexes added in
+    migration 0016, so a page costs the same however large the roster is.
     """
-    users = User.objects.filter(is_active=True).order_by('-date_joined')
-    user_list = []
-    
-    for user in users:
-        role = 'admin' if user.is_staff else 'employee'
-        user_list.append({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': role,
-            'is_staff': user.is_staff,
-            'date_joined': user.date_joined.strftime('%Y-%m-%d %H:%M:%S') if user.date_joined else None,
-            'is_active': user.is_active,
-        })
-    
-    return Response(user_list)
+    params = request.query_params
+    users = User.objects.filter(is_active=True)
+
+    role = params.get('role')
+    if role:
+        if role not in ('admin', 'employee'):
+            raise ValidationError({'role': "Expected 'admin' or 'employee'."})
+        users = users.filter(is_staff=(role == 'admin'))
+
+    search = params.get('search', '').strip().lower()
+    if search:
+        users = users.alias(username_key=Lower('username'), email_key=EmailKey('email')).filter(
+            _prefix_range('username_key', search) | _prefix_range('email_key', search)
+        )
+
+    def build():
+        paginator = UserDirectoryPagination()
+        rows = paginator.paginate_queryset(
+            users.values_list('id', 'username', 'email', 'is_staff', 'date_joined', named=True), request
+        )
+        return paginator.get_paginated_response([
+            {
+                'id': row.id,
+                'username': row.username,
+                'email': row.email,
+                'role': 'admin' if row.is_staff else 'employee',
+                'is_staff': row.is_staff,
+                'date_joined': row.date_joined.strftime('%Y-%m-%d %H:%M:%S') if row.date_joined else None,
+                'is_active': True,
+            }
+            for row in rows
+        ])
+
+    return versions.conditional_get(request, ('user',), build)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_records(request):
+    """
+    Ranked full-text search over jobs, rentals and job reports, served from
+    the inverted index in ``api.search`` and keyset-paginated, best match
+    first.
+
+    ?q=<words>  every word must match; the last one may be a prefix
+    ?type=job,rental,report  (default: all)
+
+    Each result is {"type", "id", "score", "data"}, with ``data`` the row as
+    its list endpoint returns it.
+    """
+    params = request.query_params
+    query = params.get('q', '').strip()
+    if not query:
+        raise ValidationError({'q': 'This parameter is required.'})
+
+    types = [value for value in params.get('type', '').split(',') if value]
+    unknown = sorted(set(types) - set(search.MODEL_TYPES))
+    if unknown:
+        raise ValidationError({'type': f"Unknown type(s): {', '.join(unknown)}."})
+
+    def build():
+        paginator = SearchPagination()
+        hits = paginator.paginate_queryset(search.matches(query, types), request)
+        return paginator.get_paginated_response(search.results(hits, request))
+
+    # Rows embed their assignee (user) and device, so those versions count too.
+    return versions.conditional_get(request, ('job', 'rental', 'jobreport', 'user', 'device'), build)
+
+
+def _metrics_allowed(request):
+    """Admins, or a scraper sending ``Authorization: Bearer <METRICS_TOKEN>``."""
+    if request.user.is_staff:
+        return True
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    expected = settings.METRICS_TOKEN
+    return bool(expected) and scheme.lower() == 'bearer' and hmac.compare_digest(token.strip().encode(), expected.encode())
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_metrics(request):
+    """
+    Request, database and WebSocket metrics of this process in the
+    Prometheus text format (see ``api.metrics``).
+    """
+    if not _metrics_allowed(request):
+        return Response(
+            {'error': 'Only admins can read metrics'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_slow_requests(request):
+    """
+    The last requests slower than ``METRICS_SLOW_REQUEST_MS`` in this
+    process, oldest first, each with the SQL it ran and the time per
+    statement.
+    """
+    if not _metrics_allowed(request):
+        return Response(
+            {'error': 'Only admins can read metrics'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return Response(list(metrics.slow_requests))
 
 
 @api_view(['POST'])
@@ -358,9 +826,10 @@ def delete_user(request, user_id):
         
         # Soft delete - set is_active to False
         user_to_delete.is_active = False
-        user_to_delete.save()
+        with transaction.atomic():
+            user_to_delete.save()
         
-        logger.info(f"User {user_to_delete.username} (ID: {user_id}) deactivated by {current_user.username}")
+        logger.info("User %s (ID: %s) deactivated by %s", user_to_delete.username, user_id, current_user.username)
         
         return Response({
             'message': f'User {user_to_delete.username} has been deactivated successfully',
@@ -375,7 +844,7 @@ def delete_user(request, user_id):
             status=status.HTTP_404_NOT_FOUND
         )
     except Exception as e:
-        logger.error(f"Error deleting user {user_id}: {str(e)}")
+        logger.error("Error deleting user %s: %s", user_id, e)
         return Response(
             {'error': 'Failed to delete user'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -4,17 +4,21 @@ from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 
-import api.routing
-
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
 django_asgi_app = get_asgi_application()
 
+# Imported once the app registry is ready: these load models.
+import api.routing  # noqa: E402
+from api.media import MediaFilesHandler  # noqa: E402
+from api.middleware import TokenAuthMiddleware, WebSocketMetricsMiddleware  # noqa: E402
+
 application = ProtocolTypeRouter(
     {
-        "http": django_asgi_app,
-        "websocket": AuthMiddlewareStack(
-            URLRouter(api.routing.websocket_urlpatterns)
+        # Uploaded files are streamed here rather than through Django's sync thread.
+        "http": MediaFilesHandler(django_asgi_app),
+        "websocket": WebSocketMetricsMiddleware(
+            AuthMiddlewareStack(TokenAuthMiddleware(URLRouter(api.routing.websocket_urlpatterns)))
         ),
     }
 )
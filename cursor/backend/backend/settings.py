@@ -36,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timing covers every other middleware.
+    "api.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -102,13 +104,32 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Private uploads are linked with signed URLs valid for this many seconds
+# (up to twice as long; see api.media).
+MEDIA_URL_MAX_AGE = int(os.getenv("MEDIA_URL_MAX_AGE", "3600"))
+
+STORAGES = {
+    # FileSystemStorage that signs the URLs of private uploads
+    "default": {"BACKEND": "api.media.MediaStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Hand media bodies to the front-end server: "" (serve them ourselves),
+# "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd). See api.media.
+MEDIA_SENDFILE = os.getenv("MEDIA_SENDFILE", "")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # DRF configuration – authentication-ready (Token auth) and requires authentication by default.
+# Email login in one indexed query (api.backends); usernames still work
+AUTHENTICATION_BACKENDS = [
+    "api.backends.EmailBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -122,8 +143,19 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
+    # Keyset pagination on (created_at, id); clients may pass ?page_size= up to 500.
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", "50")),
 }
 
+# Per-process serial -> device lookup cache (api.device_cache)
+DEVICE_CACHE_SIZE = int(os.getenv("DEVICE_CACHE_SIZE", "4096"))
+DEVICE_CACHE_TTL = int(os.getenv("DEVICE_CACHE_TTL", "30"))  # seconds
+
+# Delta sync (?since=) on list endpoints (api.sync)
+SYNC_SAFETY_WINDOW = int(os.getenv("SYNC_SAFETY_WINDOW", "5"))  # seconds re-sent to cover in-flight transactions
+SYNC_TOMBSTONE_DAYS = int(os.getenv("SYNC_TOMBSTONE_DAYS", "30"))  # deletion log retention
+
 # CORS for frontend integration
 CORS_ALLOWED_ORIGINS = [
     origin
@@ -137,6 +169,34 @@ if not CORS_ALLOWED_ORIGINS:
 else:
     CORS_ALLOW_ALL_ORIGINS = False
 
+# Let the frontend read the delta sync token from full list responses
+CORS_EXPOSE_HEADERS = ["X-Sync-Token"]
+
+# Cache shared by all workers when CACHE_REDIS_URL is set; otherwise a
+# bounded per-process cache
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# Token -> user cache for API authentication (api.authentication): cache
+# alias and seconds an entry is trusted. Without a shared cache, another
+# worker may accept a deleted token for this long, so keep it short.
+TOKEN_CACHE_ALIAS = os.getenv("TOKEN_CACHE_ALIAS", "default")
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300" if CACHE_REDIS_URL else "5"))
+
 CHANNEL_REDIS_URL = os.getenv("CHANNEL_REDIS_URL")
 
 if CHANNEL_REDIS_URL:
@@ -153,44 +213,73 @@ else:
         }
     }
 
-# Logging configuration
+# WebSocket fan-out (api.consumers): outbound coalescing window, events per
+# batch frame, and how far behind (ms) a client may fall before it is closed
+WS_COALESCE_MS = int(os.getenv("WS_COALESCE_MS", "50"))
+WS_BATCH_SIZE = int(os.getenv("WS_BATCH_SIZE", "100"))
+WS_MAX_LAG_MS = int(os.getenv("WS_MAX_LAG_MS", "15000"))
+
+# Upload post-processing threads (api.images); 0 processes inline after commit
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# Bulk import (api.imports): rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+# Streaming export (api.exports): rows read per query
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+# Logging (api.logs): a background thread writes JSON lines to LOG_FILE,
+# rotated at LOG_MAX_BYTES, and text (or JSON) to the console unless
+# LOG_CONSOLE=off. One in N records of the events in LOG_SAMPLE_RATES is kept.
+LOG_FILE = os.getenv("LOG_FILE", str(BASE_DIR / "debug.log"))
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "text")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATES = {"job.list": int(os.getenv("LOG_SAMPLE_JOB_LIST", "100"))}
+API_LOG_LEVEL = os.getenv("API_LOG_LEVEL", "INFO")
+
+# Metrics (api.metrics), served at /api/metrics/ to admins and to scrapers
+# sending "Authorization: Bearer <METRICS_TOKEN>". Requests slower than
+# METRICS_SLOW_REQUEST_MS (0 = off) are logged with their SQL, and the last
+# METRICS_SLOW_SAMPLES of them are listed at /api/metrics/slow/.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_SLOW_REQUEST_MS = int(os.getenv("METRICS_SLOW_REQUEST_MS", "0"))
+METRICS_SLOW_SAMPLES = int(os.getenv("METRICS_SLOW_SAMPLES", "50"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "formatters": {
-        "verbose": {
-            "format": "{levelname} {asctime} {module} {message}",
-            "style": "{",
-        },
-        "simple": {
-            "format": "{levelname} {message}",
-            "style": "{",
+    "filters": {
+        "sampling": {
+            "()": "api.logs.SamplingFilter",
+            "rates": LOG_SAMPLE_RATES,
         },
     },
     "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
-        },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": BASE_DIR / "debug.log",
-            "formatter": "verbose",
+        "queue": {
+            "()": "api.logs.QueuedHandler",
+            "filename": LOG_FILE,
+            "max_bytes": LOG_MAX_BYTES,
+            "backup_count": LOG_BACKUP_COUNT,
+            "console": LOG_CONSOLE,
+            "queue_size": LOG_QUEUE_SIZE,
+            "filters": ["sampling"],
         },
     },
     "root": {
-        "handlers": ["console", "file"],
+        "handlers": ["queue"],
         "level": "INFO",
     },
     "loggers": {
         "django": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": False,
         },
         "api": {
-            "handlers": ["console", "file"],
-            "level": "DEBUG",
+            "handlers": ["queue"],
+            "level": API_LOG_LEVEL,
             "propagate": False,
         },
     },
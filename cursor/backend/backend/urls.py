@@ -1,14 +1,21 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from api.media import serve_media
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Under ASGI, backend.asgi serves public, signed and token-authenticated files
+# before Django sees them; this route covers WSGI deployments and session
+# logins, and answers 401 to everyone else (see api.media).
+urlpatterns += [
+    re_path(r"^%s(?P<path>.+)$" % re.escape(settings.MEDIA_URL.lstrip("/")), serve_media),
+]
 
 
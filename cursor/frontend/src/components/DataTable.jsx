@@ -1,4 +1,5 @@
-import { useState, useMemo } from 'react'
+import { useState, useMemo, useEffect } from 'react'
+import { api, endpoints } from '../services/api'
 
 const DataTable = ({
   data = [],
@@ -6,6 +7,8 @@ const DataTable = ({
   keyField = 'id',
   searchable = true,
   searchPlaceholder = 'Search...',
+  // 'job' | 'rental' | 'report': match through /api/search/ instead of substrings in the browser
+  searchType = null,
   pagination = true,
   itemsPerPage = 10,
   onRowClick = null,
@@ -18,6 +21,27 @@ const DataTable = ({
   const [currentPage, setCurrentPage] = useState(1)
   const [showAllColumns, setShowAllColumns] = useState(false)
   const [showActionsMenu, setShowActionsMenu] = useState(null)
+  // ids returned by the server search for searchQuery (null until it answers)
+  const [searchHits, setSearchHits] = useState(null)
+
+  useEffect(() => {
+    setSearchHits(null)
+    if (!searchType || !searchQuery.trim()) return undefined
+    let cancelled = false
+    // Wait for a pause in typing before asking the server
+    const timer = setTimeout(async () => {
+      try {
+        const hits = await api.getAll(endpoints.search({ q: searchQuery, type: searchType, page_size: 500 }))
+        if (!cancelled) setSearchHits(new Set(hits.map((hit) => hit.id)))
+      } catch (err) {
+        console.error('Search failed:', err)
+      }
+    }, 250)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [searchQuery, searchType])
 
   // Define visible columns for mobile (first 2 columns only by default)
   const visibleColumns = showAllColumns ? columns : columns.slice(0, 2)
@@ -38,7 +62,9 @@ const DataTable = ({
     let filtered = [...data]
 
     // Apply search filter
-    if (searchQuery && searchable) {
+    if (searchQuery && searchable && searchType) {
+      filtered = searchHits ? filtered.filter((row) => searchHits.has(row[keyField])) : filtered
+    } else if (searchQuery && searchable) {
       const query = searchQuery.toLowerCase()
       filtered = filtered.filter((row) =>
         columns.some((col) => {
@@ -69,7 +95,7 @@ const DataTable = ({
     }
 
     return filtered
-  }, [data, searchQuery, sortConfig, columns, searchable])
+  }, [data, searchQuery, searchHits, searchType, keyField, sortConfig, columns, searchable])
 
   // Pagination
   const totalPages = Math.ceil(processedData.length / itemsPerPage)
@@ -21,7 +21,7 @@ const AddDevice = () => {
 
   const fetchExistingDevices = async () => {
     try {
-      const data = await api.get(endpoints.devices.list)
+      const data = await api.getAll(endpoints.devices.list)
       setExistingDevices(data)
     } catch (error) {
       console.error('Error fetching devices:', error)
@@ -17,7 +17,7 @@ const AvailableDevices = () => {
     try {
       setLoading(true)
       setError('')
-      const data = await api.get(endpoints.devices.list)
+      const data = await api.getAll(endpoints.devices.list)
       // Sort by serial number (alphabetical)
       const sortedDevices = data.sort((a, b) => a.serial_no.localeCompare(b.serial_no))
       setAllDevices(sortedDevices)
@@ -22,10 +22,8 @@ const CompletedJobs = () => {
     try {
       setLoading(true)
       setError('')
-      const data = await api.get(endpoints.jobs.list)
-      // Filter for completed jobs only
-      const completedJobs = data.filter((job) => job.status === 'completed')
-      setJobs(completedJobs)
+      const data = await api.getAll(endpoints.jobs.filter({ status: 'completed' }))
+      setJobs(data)
     } catch (error) {
       console.error('Error fetching completed jobs:', error)
       setError(error.message || 'Failed to load completed jobs')
@@ -3,9 +3,9 @@ import { useNavigate } from 'react-router-dom'
 import { api, endpoints } from '../../services/api'
 import { useToast } from '../Toast'
 import Breadcrumbs from '../Breadcrumbs'
-import DataTable from '../DataTable'
 import LoadingSkeleton from '../LoadingSkeleton'
 import AnimatedList from '../AnimatedList'
+import UserDirectory from './UserDirectory'
 
 const Dashboard = () => {
   const navigate = useNavigate()
@@ -18,6 +18,8 @@ const Dashboard = () => {
   const [loadingDetails, setLoadingDetails] = useState(false)
   const [deletingUserId, setDeletingUserId] = useState(null)
   const [userToDelete, setUserToDelete] = useState(null)
+  // Bumped after a deactivation so the user directory reloads its page
+  const [usersVersion, setUsersVersion] = useState(0)
 
   useEffect(() => {
     fetchDashboardStats()
@@ -43,16 +45,13 @@ const Dashboard = () => {
       let data = []
       switch (type) {
         case 'jobs':
-          data = await api.get(endpoints.jobs.list)
+          data = await api.getAll(endpoints.jobs.list)
           break
         case 'rentals':
-          data = await api.get(endpoints.rentals.list)
+          data = await api.getAll(endpoints.rentals.list)
           break
         case 'devices':
-          data = await api.get(endpoints.devices.list)
-          break
-        case 'users':
-          data = await api.get(endpoints.users.list)
+          data = await api.getAll(endpoints.devices.list)
           break
         default:
           break
@@ -67,7 +66,8 @@ const Dashboard = () => {
 
   const handleCardClick = (cardType) => {
     setSelectedCard(cardType)
-    fetchDetails(cardType)
+    // The user directory pages through /api/users/ itself
+    if (cardType !== 'users') fetchDetails(cardType)
   }
 
   const closeModal = () => {
@@ -89,10 +89,8 @@ const Dashboard = () => {
 
       showSuccessToast(`User ${userToDelete.username} has been deactivated successfully`)
 
-      // Remove user from the list
-      setDetailsData((prevData) =>
-        prevData.filter((user) => user.id !== userToDelete.id)
-      )
+      // Reload the directory page without the deactivated user
+      setUsersVersion((version) => version + 1)
     } catch (err) {
       console.error('Error deleting user:', err)
       showErrorToast(err.message || 'Failed to delete user. Please try again.')
@@ -206,7 +204,56 @@ const Dashboard = () => {
           </div>
 
           <div className="p-6 overflow-y-auto max-h-[60vh]">
-            {loadingDetails ? (
+            {selectedCard === 'users' ? (
+              <UserDirectory
+                key={usersVersion}
+                columns={[
+                  {
+                    key: 'username',
+                    title: 'Username',
+                    searchable: true,
+                  },
+                  {
+                    key: 'email',
+                    title: 'Email',
+                    searchable: true,
+                  },
+                  {
+                    key: 'role',
+                    title: 'Role',
+                    render: (value) => (
+                      <span
+                        className={`px-3 py-1 rounded-full text-xs font-medium ${
+                          value === 'admin'
+                            ? 'bg-red-100 text-red-800'
+                            : 'bg-blue-100 text-blue-800'
+                        }`}
+                      >
+                        {value}
+                      </span>
+                    ),
+                  },
+                  {
+                    key: 'date_joined',
+                    title: 'Joined',
+                    render: (value) => value || 'N/A',
+                  },
+                ]}
+                rowActions={[
+                  {
+                    label: 'Remove User',
+                    icon: (
+                      <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16" />
+                      </svg>
+                    ),
+                    onClick: (user) => handleDeleteUser(user),
+                    disabled: (user) => deletingUserId === user.id,
+                    className: 'text-red-600 hover:text-red-800 hover:bg-red-50',
+                  },
+                ]}
+              />
+            ) : loadingDetails ? (
               <div className="flex items-center justify-center py-8">
                 <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-primary"></div>
                 <span className="ml-3 text-text-secondary">Loading details...</span>
@@ -299,61 +346,6 @@ const Dashboard = () => {
                     </div>
                   ))}
 
-                {selectedCard === 'users' && (
-                  <DataTable
-                    data={detailsData}
-                    columns={[
-                      {
-                        key: 'username',
-                        title: 'Username',
-                        searchable: true,
-                      },
-                      {
-                        key: 'email',
-                        title: 'Email',
-                        searchable: true,
-                      },
-                      {
-                        key: 'role',
-                        title: 'Role',
-                        render: (value) => (
-                          <span
-                            className={`px-3 py-1 rounded-full text-xs font-medium ${
-                              value === 'admin'
-                                ? 'bg-red-100 text-red-800'
-                                : 'bg-blue-100 text-blue-800'
-                            }`}
-                          >
-                            {value}
-                          </span>
-                        ),
-                      },
-                      {
-                        key: 'date_joined',
-                        title: 'Joined',
-                        render: (value) => value || 'N/A',
-                      },
-                    ]}
-                    rowActions={[
-                      {
-                        label: 'Remove User',
-                        icon: (
-                          <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16" />
-                          </svg>
-                        ),
-                        onClick: (user) => handleDeleteUser(user),
-                        disabled: (user) => deletingUserId === user.id,
-                        className: 'text-red-600 hover:text-red-800 hover:bg-red-50',
-                      },
-                    ]}
-                    keyField="id"
-                    searchable={true}
-                    searchPlaceholder="Search users..."
-                    pagination={true}
-                    itemsPerPage={10}
-                  />
-                )}
               </div>
             ) : (
               <div className="text-center py-8">
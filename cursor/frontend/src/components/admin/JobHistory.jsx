@@ -21,7 +21,7 @@ const JobHistory = () => {
     try {
       setLoading(true)
       setError('')
-      const data = await api.get(endpoints.jobs.list)
+      const data = await api.getAll(endpoints.jobs.list)
       setAllJobs(data)
     } catch (error) {
       console.error('Error fetching jobs:', error)
@@ -452,6 +452,7 @@ const JobHistory = () => {
                   columns={tableColumns}
                   keyField="id"
                   searchable={true}
+                  searchType="job"
                   searchPlaceholder="Search completed jobs..."
                   pagination={true}
                   itemsPerPage={10}
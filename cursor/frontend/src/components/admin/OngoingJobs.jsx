@@ -22,10 +22,8 @@ const OngoingJobs = () => {
     try {
       setLoading(true)
       setError('')
-      const data = await api.get(endpoints.jobs.list)
-      // Filter for ongoing jobs only
-      const ongoingJobs = data.filter((job) => job.status === 'in_progress')
-      setJobs(ongoingJobs)
+      const data = await api.getAll(endpoints.jobs.filter({ status: 'in_progress' }))
+      setJobs(data)
     } catch (error) {
       console.error('Error fetching ongoing jobs:', error)
       setError(error.message || 'Failed to load ongoing jobs')
@@ -6,32 +6,24 @@ import Breadcrumbs from '../Breadcrumbs'
 const OngoingRentals = () => {
   const { success: showSuccessToast, error: showErrorToast } = useToast()
   const [rentals, setRentals] = useState([])
-  const [devices, setDevices] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [returningId, setReturningId] = useState(null)
 
   useEffect(() => {
-    fetchRentalsAndDevices()
+    fetchRentals()
   }, [])
 
-  const fetchRentalsAndDevices = async () => {
+  const fetchRentals = async () => {
     try {
       setLoading(true)
       setError('')
 
-      const [rentalsData, devicesData] = await Promise.all([
-        api.get(endpoints.rentals.list),
-        api.get(endpoints.devices.list),
-      ])
-
-      const deviceMap = {}
-      devicesData.forEach((device) => {
-        deviceMap[device.serial_no] = device
-      })
+      // Rentals embed their device (device_details), so no separate devices download
+      const rentalsData = await api.getAll(endpoints.rentals.byStatus('active'))
 
       const enrichedRentals = rentalsData.map((rental) => {
-        const device = deviceMap[rental.device_serial] || {}
+        const device = rental.device_details || {}
         const today = new Date()
         const toDate = new Date(rental.to_date)
         const fromDate = new Date(rental.from_date)
@@ -58,17 +50,12 @@ const OngoingRentals = () => {
           securityDeposit: rental.security_deposit,
           status: rental.status,
           dateStatus: dateStatus,
-          idProof: rental.id_proof,
+          idProof: rental.id_proof_variants?.web || rental.id_proof,
           createdAt: rental.created_at,
         }
       })
 
-      const ongoingRentals = enrichedRentals.filter(
-        (rental) => rental.status === 'active'
-      )
-
-      setRentals(ongoingRentals)
-      setDevices(devicesData)
+      setRentals(enrichedRentals)
     } catch (err) {
       console.error('Error fetching rentals:', err)
       setError(err.message || 'Failed to load ongoing rentals. Please try again.')
@@ -301,7 +288,7 @@ const OngoingRentals = () => {
               </svg>
               <p className="text-red-700 mb-4">{error}</p>
               <button
-                onClick={fetchRentalsAndDevices}
+                onClick={fetchRentals}
                 className="btn-primary px-6 py-2 flex items-center gap-2"
               >
                 <svg
@@ -22,10 +22,8 @@ const OpenJobs = () => {
     try {
       setLoading(true)
       setError('')
-      const data = await api.get(endpoints.jobs.list)
-      // Filter for open jobs only
-      const openJobs = data.filter((job) => job.status === 'open')
-      setJobs(openJobs)
+      const data = await api.getAll(endpoints.jobs.filter({ status: 'open' }))
+      setJobs(data)
     } catch (error) {
       console.error('Error fetching open jobs:', error)
       setError(error.message || 'Failed to load open jobs')
@@ -282,6 +280,7 @@ const OpenJobs = () => {
                 columns={tableColumns}
                 keyField="id"
                 searchable={true}
+                searchType="job"
                 searchPlaceholder="Search open jobs..."
                 pagination={filteredJobs.length > 10}
                 itemsPerPage={10}
@@ -10,17 +10,16 @@ import LoadingSkeleton from '../LoadingSkeleton'
 const RentalHistory = () => {
   const { success: showSuccessToast } = useToast()
   const [rentals, setRentals] = useState([])
-  const [devices, setDevices] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [activeFilters, setActiveFilters] = useState({})
 
   useEffect(() => {
-    fetchRentalsAndDevices()
+    fetchRentals()
 
-    const handleFocus = () => fetchRentalsAndDevices()
+    const handleFocus = () => fetchRentals()
     const handleVisibilityChange = () => {
-      if (document.visibilityState === 'visible') fetchRentalsAndDevices()
+      if (document.visibilityState === 'visible') fetchRentals()
     }
 
     window.addEventListener('focus', handleFocus)
@@ -32,23 +31,16 @@ const RentalHistory = () => {
     }
   }, [])
 
-  const fetchRentalsAndDevices = async () => {
+  const fetchRentals = async () => {
     try {
       setLoading(true)
       setError('')
 
-      const [rentalsData, devicesData] = await Promise.all([
-        api.get(endpoints.rentals.list),
-        api.get(endpoints.devices.list),
-      ])
-
-      const deviceMap = {}
-      devicesData.forEach((device) => {
-        deviceMap[device.serial_no] = device
-      })
+      // Rentals embed their device (device_details), so no separate devices download
+      const rentalsData = await api.getAll(endpoints.rentals.byStatus('returned'))
 
       const enrichedRentals = rentalsData.map((rental) => {
-        const device = deviceMap[rental.device_serial] || {}
+        const device = rental.device_details || {}
         return {
           id: rental.id,
           customerName: rental.customer_name,
@@ -61,18 +53,13 @@ const RentalHistory = () => {
           rentalDays: rental.rental_days,
           securityDeposit: Number(rental.security_deposit) || 0,
           status: rental.status,
-          idProof: rental.id_proof,
+          idProof: rental.id_proof_variants?.web || rental.id_proof,
           createdAt: rental.created_at,
           returnedAt: rental.updated_at || rental.created_at,
         }
       })
 
-      const returnedRentals = enrichedRentals.filter(
-        (rental) => rental.status === 'returned'
-      )
-
-      setRentals(returnedRentals)
-      setDevices(devicesData)
+      setRentals(enrichedRentals)
     } catch (err) {
       console.error('Error fetching rentals:', err)
       setError(err.message || 'Failed to load rental history. Please try again.')
@@ -236,7 +223,7 @@ const RentalHistory = () => {
                 <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z" />
               </svg>
               <p className="text-red-700 mb-4">{error}</p>
-              <button onClick={fetchRentalsAndDevices} className="btn-primary px-6 py-2">
+              <button onClick={fetchRentals} className="btn-primary px-6 py-2">
                 Retry
               </button>
             </div>
@@ -275,7 +262,8 @@ const RentalHistory = () => {
               columns={tableColumns}
               keyField="id"
               searchable={true}
-              searchPlaceholder="Search by customer, device, or serial number..."
+              searchType="rental"
+              searchPlaceholder="Search by customer, phone, or serial number..."
               pagination={true}
               itemsPerPage={10}
               rowActions={rowActions}
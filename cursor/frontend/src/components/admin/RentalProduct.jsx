@@ -27,7 +27,7 @@ const RentalProduct = () => {
   const fetchAvailableDevices = async () => {
     try {
       setLoadingDevices(true)
-      const data = await api.get(endpoints.devices.list)
+      const data = await api.getAll(endpoints.devices.list)
       const available = data.filter(d => d.availability === 'available')
       setAvailableDevices(available)
     } catch (error) {
@@ -0,0 +1,107 @@
+import { useEffect, useState } from 'react'
+import { api, endpoints } from '../../services/api'
+import DataTable from '../DataTable'
+
+const PAGE_SIZE = 10
+
+/**
+ * User directory served a page at a time by /api/users/: the search box
+ * (?search=, username or email prefix) and role filter (?role=) are applied
+ * by the server, and Previous/Next follow its cursor links.
+ */
+const UserDirectory = ({ columns, rowActions = [] }) => {
+  const [search, setSearch] = useState('')
+  const [role, setRole] = useState('')
+  // Cursor link of the page to show; null means the first page for the filters
+  const [pageUrl, setPageUrl] = useState(null)
+  const [page, setPage] = useState(null)
+  const [loading, setLoading] = useState(true)
+
+  useEffect(() => {
+    let cancelled = false
+    const params = { page_size: PAGE_SIZE }
+    if (search.trim()) params.search = search.trim()
+    if (role) params.role = role
+    const url = pageUrl || endpoints.users.filter(params)
+    // Wait for a pause in typing before asking the server
+    const timer = setTimeout(async () => {
+      setLoading(true)
+      try {
+        const data = await api.getPage(url)
+        if (!cancelled) setPage(data)
+      } catch (err) {
+        console.error('Error fetching users:', err)
+      } finally {
+        if (!cancelled) setLoading(false)
+      }
+    }, pageUrl ? 0 : 250)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [search, role, pageUrl])
+
+  return (
+    <div className="space-y-4">
+      <div className="flex flex-col sm:flex-row gap-3">
+        <input
+          type="text"
+          placeholder="Search by username or email..."
+          value={search}
+          onChange={(e) => {
+            setSearch(e.target.value)
+            setPageUrl(null)
+          }}
+          className="input-field"
+        />
+        <select
+          value={role}
+          onChange={(e) => {
+            setRole(e.target.value)
+            setPageUrl(null)
+          }}
+          className="input-field sm:w-48"
+        >
+          <option value="">All roles</option>
+          <option value="admin">Admins</option>
+          <option value="employee">Employees</option>
+        </select>
+      </div>
+
+      {page && page.results.length === 0 && !loading ? (
+        <p className="text-center py-8 text-text-secondary">No users match your search criteria.</p>
+      ) : (
+        <DataTable
+          data={page?.results || []}
+          columns={columns}
+          rowActions={rowActions}
+          keyField="id"
+          searchable={false}
+          pagination={false}
+          loading={loading && !page}
+        />
+      )}
+
+      {(page?.previous || page?.next) && (
+        <div className="flex items-center justify-between gap-4">
+          <button
+            onClick={() => setPageUrl(page.previous)}
+            disabled={!page.previous || loading}
+            className="btn-secondary py-2.5 px-4"
+          >
+            Previous
+          </button>
+          <button
+            onClick={() => setPageUrl(page.next)}
+            disabled={!page.next || loading}
+            className="btn-secondary py-2.5 px-4"
+          >
+            Next
+          </button>
+        </div>
+      )}
+    </div>
+  )
+}
+
+export default UserDirectory
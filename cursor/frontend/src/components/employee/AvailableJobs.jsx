@@ -1,9 +1,22 @@
 import { useEffect, useState } from 'react'
 import { api, endpoints } from '../../services/api'
+import { subscribe } from '../../services/realtime'
 import { useToast } from '../Toast'
 import Breadcrumbs from '../Breadcrumbs'
 import EmptyState from '../EmptyState'
 
+const toRow = (job) => ({
+  id: job.id,
+  customer: job.customer_name,
+  location: job.location,
+  issue: job.issue,
+  postedDate: job.work_date,
+  estimatedTime: '2-3 hours',
+  priority: job.priority,
+  status: job.status,
+  skills: [],
+})
+
 const AvailableJobs = () => {
   const { success: showSuccessToast, error: showErrorToast } = useToast()
   const [searchQuery, setSearchQuery] = useState('')
@@ -18,22 +31,9 @@ const AvailableJobs = () => {
       setLoading(true)
       setError('')
       try {
-        const data = await api.get(endpoints.jobs.list)
         // Only show 'open' jobs in the available jobs list
-        const openJobs = data
-          .filter((job) => job.status === 'open')
-          .map((job) => ({
-            id: job.id,
-            customer: job.customer_name,
-            location: job.location,
-            issue: job.issue,
-            postedDate: job.work_date,
-            estimatedTime: '2-3 hours',
-            priority: job.priority,
-            status: job.status,
-            skills: [],
-          }))
-        setJobs(openJobs)
+        const data = await api.getAll(endpoints.jobs.filter({ status: 'open' }))
+        setJobs(data.map(toRow))
       } catch (err) {
         console.error('Error fetching jobs:', err)
         setError(err.message || 'An unexpected error occurred while loading jobs.')
@@ -45,6 +45,22 @@ const AvailableJobs = () => {
     fetchJobs()
   }, [])
 
+  // Keep the list current as jobs are posted, edited or claimed by others
+  useEffect(
+    () =>
+      subscribe((event) => {
+        if (!event.type.startsWith('job.')) return
+        setJobs((prev) => {
+          if (event.data.status !== 'open') return prev.filter((j) => j.id !== event.id)
+          const row = toRow(event.data)
+          return prev.some((j) => j.id === event.id)
+            ? prev.map((j) => (j.id === event.id ? row : j))
+            : [row, ...prev]
+        })
+      }),
+    []
+  )
+
   const handleAcceptJob = async (jobId) => {
     const job = jobs.find((j) => j.id === jobId)
     if (!job) return
@@ -52,8 +68,8 @@ const AvailableJobs = () => {
     setAcceptingJobId(jobId)
 
     try {
-      // Update job status to 'in_progress' (accepted)
-      await api.patch(endpoints.jobs.detail(jobId), { status: 'in_progress' })
+      // Claim the job; fails with 409 if another employee accepted it first
+      await api.post(endpoints.jobs.claim(jobId))
 
       // Remove accepted job from the available jobs list
       setJobs((prev) => prev.filter((j) => j.id !== jobId))
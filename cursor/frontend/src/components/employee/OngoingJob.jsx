@@ -13,19 +13,16 @@ const OngoingJob = () => {
       setLoading(true)
       setError('')
       try {
-        const data = await api.get(endpoints.jobs.list)
-
-        // Filter only in_progress jobs
-        const ongoing = data
-          .filter((job) => job.status === 'in_progress')
-          .map((job) => ({
-            id: job.id,
-            customer: job.customer_name,
-            location: job.location,
-            issue: job.issue,
-            startedDate: job.work_date,
-            priority: job.priority,
-          }))
+        // Only in_progress jobs
+        const data = await api.getAll(endpoints.jobs.filter({ status: 'in_progress' }))
+        const ongoing = data.map((job) => ({
+          id: job.id,
+          customer: job.customer_name,
+          location: job.location,
+          issue: job.issue,
+          startedDate: job.work_date,
+          priority: job.priority,
+        }))
 
         setJobs(ongoing)
       } catch (err) {
@@ -12,27 +12,18 @@ const RecentlyCompleted = () => {
 
   const fetchCompletedJobs = async () => {
     try {
-      const data = await api.get(endpoints.jobs.list)
-      const completed = data.filter(job => job.status === 'completed')
-      // For each completed job, fetch the report
-      const jobsWithReports = await Promise.all(completed.map(async (job) => {
-        try {
-          const reports = await api.get(endpoints.reports.byJob(job.id))
-          const report = reports[0]
-          return {
-            id: job.id,
-            customer: report ? report.company_name : job.customer_name,
-            workDescription: report ? report.work_description : 'No description available',
-          }
-        } catch (error) {
-          console.error('Error fetching report for job', job.id, error)
-          return {
-            id: job.id,
-            customer: job.customer_name,
-            workDescription: 'No description available',
-          }
+      // Each job arrives with its latest report embedded, in a single request
+      const completed = await api.getAll(
+        endpoints.jobs.filter({ status: 'completed', include: 'latest_report' })
+      )
+      const jobsWithReports = completed.map((job) => {
+        const report = job.latest_report
+        return {
+          id: job.id,
+          customer: report ? report.company_name : job.customer_name,
+          workDescription: report ? report.work_description : 'No description available',
         }
-      }))
+      })
       setJobs(jobsWithReports)
       setError(null)
     } catch (error) {
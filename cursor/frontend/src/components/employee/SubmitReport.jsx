@@ -31,7 +31,7 @@ const SubmitReport = () => {
     setLoadingJobs(true)
     setJobsError('')
     try {
-      const data = await api.get(endpoints.jobs.list)
+      const data = await api.getAll(endpoints.jobs.list)
       const inProgress = data.filter(job => job.status === 'in_progress')
       setInProgressJobs(inProgress)
 
@@ -8,3 +8,8 @@ export const API_BASE_URL =
 
 
 
+
+// WebSocket origin for realtime updates; defaults to the API origin over ws(s)://
+//   VITE_WS_BASE_URL="ws://localhost:8000"
+export const WS_BASE_URL =
+  import.meta.env.VITE_WS_BASE_URL || API_BASE_URL.replace(/^http/, 'ws');
@@ -48,17 +48,55 @@ const handleResponse = async (response) => {
   return response.json()
 }
 
+// Resolve an endpoint path, or pass through an absolute URL (e.g. a pagination `next` link)
+const toUrl = (endpoint) => (/^https?:\/\//.test(endpoint) ? endpoint : `${API_BASE_URL}${endpoint}`)
+
 // HTTP methods
 export const api = {
   // GET request
   get: async (endpoint) => {
-    const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+    const response = await fetch(toUrl(endpoint), {
       method: 'GET',
       headers: getHeaders(),
     })
     return handleResponse(response)
   },
 
+  // GET a single page of a paginated list: { results, next, previous }
+  // Pass `page.next` / `page.previous` back in to move between pages.
+  getPage: async (endpoint) => api.get(endpoint),
+
+  // GET every page of a paginated list by following `next` cursors
+  getAll: async (endpoint) => {
+    const rows = []
+    let url = endpoint
+    while (url) {
+      const page = await api.get(url)
+      rows.push(...page.results)
+      url = page.next
+    }
+    return rows
+  },
+
+  // GET the changes to a list since a sync token ('0' for everything):
+  // { changed, deleted, token }. Upsert `changed` by id, drop `deleted` ids,
+  // and pass `token` back next time. A 410 means the token expired: reload.
+  getChanges: async (endpoint, since = '0') => {
+    const sep = endpoint.includes('?') ? '&' : '?'
+    const changed = []
+    const deleted = []
+    let token = since
+    let more = true
+    while (more) {
+      const page = await api.get(`${endpoint}${sep}since=${encodeURIComponent(token)}`)
+      changed.push(...page.changed)
+      deleted.push(...page.deleted)
+      token = page.token
+      more = page.more
+    }
+    return { changed, deleted, token }
+  },
+
   // POST request
   post: async (endpoint, data) => {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
@@ -107,11 +145,17 @@ export const endpoints = {
   jobs: {
     list: '/api/jobs/',
     detail: (id) => `/api/jobs/${id}/`,
+    // POST: take an open job; 409 if someone else got it first
+    claim: (id) => `/api/jobs/${id}/claim/`,
+    // Server-side filters: status, priority, assigned_to, work_date__gte, work_date__lte
+    // Pass include: 'latest_report' to embed each job's most recent report
+    filter: (params) => `/api/jobs/?${new URLSearchParams(params)}`,
   },
 
   // Rentals
   rentals: {
     list: '/api/rentals/',
+    byStatus: (status) => `/api/rentals/?status=${status}`,
     detail: (id) => `/api/rentals/${id}/`,
     return: (id) => `/api/rentals/${id}/return/`,
   },
@@ -120,7 +164,10 @@ export const endpoints = {
   devices: {
     list: '/api/devices/',
     detail: (id) => `/api/devices/${id}/`,
-    bySerial: (serial) => `/api/devices/?serial_no=${serial}`,
+    bySerial: (serial) => `/api/devices/by-serial/${encodeURIComponent(serial)}/`,
+    bySerials: (serials) => `/api/devices/by-serial/?serial_no__in=${serials.map(encodeURIComponent).join(',')}`,
+    // Devices free for the whole date range (YYYY-MM-DD), paginated like the list
+    available: (from, to) => `/api/devices/available/?${new URLSearchParams({ from, to })}`,
   },
 
   // Reports
@@ -128,11 +175,17 @@ export const endpoints = {
     list: '/api/reports/',
     detail: (id) => `/api/reports/${id}/`,
     byJob: (jobId) => `/api/reports/?job=${jobId}`,
+    byJobs: (jobIds) => `/api/reports/?job__in=${jobIds.join(',')}`,
   },
 
+  // Ranked full-text search; params: q, type ('job,rental,report'), paginated
+  search: (params) => `/api/search/?${new URLSearchParams(params)}`,
+
   // Users
   users: {
     list: '/api/users/',
+    // Paginated; filters: search (username/email prefix), role ('admin' | 'employee')
+    filter: (params) => `/api/users/?${new URLSearchParams(params)}`,
     delete: (id) => `/api/users/${id}/delete/`,
   },
 }
@@ -0,0 +1,65 @@
+import { WS_BASE_URL } from '../config'
+
+/**
+ * Realtime model change events from /ws/notifications/.
+ *
+ * One shared socket per tab, authenticated with the stored auth token and
+ * reconnected with backoff. Handlers receive one event at a time, e.g.
+ * { type: 'job.claimed', id: 42, data: { ...job } }; batch frames are
+ * unpacked here. Events are upserts, so applying one twice is harmless.
+ * Pings are answered here: the server closes sockets that stop answering.
+ */
+
+// Close code sent when the user is deactivated or the token revoked
+const CLOSE_REVOKED = 4001
+
+const handlers = new Set()
+let socket = null
+let retryDelay = 1000
+let retryTimer = null
+
+const dispatch = (frame) => {
+  const events = frame.type === 'batch' ? frame.events : [frame]
+  events.forEach((event) => handlers.forEach((handler) => handler(event)))
+}
+
+const connect = () => {
+  const token = localStorage.getItem('authToken')
+  if (!token || socket) return
+
+  socket = new WebSocket(`${WS_BASE_URL}/ws/notifications/?token=${encodeURIComponent(token)}`)
+  socket.onopen = () => {
+    retryDelay = 1000
+  }
+  socket.onmessage = (message) => {
+    try {
+      const frame = JSON.parse(message.data)
+      if (frame.type === 'ping') {
+        socket.send(JSON.stringify({ type: 'pong', seq: frame.seq }))
+        return
+      }
+      dispatch(frame)
+    } catch (err) {
+      console.error('Bad realtime frame:', err)
+    }
+  }
+  socket.onclose = (event) => {
+    socket = null
+    if (handlers.size === 0 || event.code === CLOSE_REVOKED) return
+    retryTimer = setTimeout(connect, retryDelay)
+    retryDelay = Math.min(retryDelay * 2, 30000)
+  }
+}
+
+// Subscribe to events; returns an unsubscribe function (use it as a useEffect cleanup).
+export const subscribe = (handler) => {
+  handlers.add(handler)
+  connect()
+  return () => {
+    handlers.delete(handler)
+    if (handlers.size === 0) {
+      clearTimeout(retryTimer)
+      socket?.close()
+    }
+  }
+}